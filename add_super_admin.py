@@ -1,6 +1,6 @@
 from app.database import SessionLocal
 from app import models
-from app.utils import hash_password
+from app.utils import DEFAULT_PASSWORD, hash_password
 
 
 def main():
@@ -11,7 +11,8 @@ def main():
             # Ensure correct role and reset password hash to pbkdf2 version
             existing.name = "Admin"
             existing.role = "superadmin"
-            existing.password_hash = hash_password("12345")
+            existing.password_hash = hash_password(DEFAULT_PASSWORD)
+            existing.must_change_password = True
             db.add(existing)
             db.commit()
             print("Superadmin ensured/updated: admin@mail.com / 12345")
@@ -19,7 +20,8 @@ def main():
         user = models.User(
             name="Admin",
             email="admin@mail.com",
-            password_hash=hash_password("12345"),
+            password_hash=hash_password(DEFAULT_PASSWORD),
+            must_change_password=True,
             role="superadmin",
             region_id=None,
         )
@@ -0,0 +1,177 @@
+"""Cache-friendly serving of /static and /uploads.
+
+- ``static_url("css/style.css")`` returns a fingerprinted URL such as
+  ``/static/css/style.1a2b3c4d.css``. The fingerprint comes from the file
+  content, so a matching request gets a one-year ``immutable`` max-age.
+- Every file is served with a strong ETag computed from its content, and
+  ``If-None-Match`` gets a 304. Content-addressed uploads (blobs and their
+  variants) take it from their file name instead of being read; other files
+  are hashed in a worker thread.
+- When the client accepts it, a ``.br`` or ``.gz`` sidecar next to the file
+  is served with ``Content-Encoding``. ``build_assets.py`` writes them.
+- Other paths can be declared immutable with ``immutable_paths``, e.g.
+  content-addressed upload blobs.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+
+STATIC_DIR = os.path.join("app", "static")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Sidecar encodings in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+DIGEST_CACHE_SIZE = 1024
+
+_FINGERPRINTED = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{8})(?P<ext>\.[A-Za-z0-9]+)$")
+# Upload blobs (<sha256>.ext) and their variants (<sha256>_<width>w.ext)
+_CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{64}(_\d+w)?\.[a-z0-9]+$")
+
+_digests: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+_digests_lock = threading.Lock()
+
+
+def content_digest(full_path: str, stat_result: Optional[os.stat_result] = None) -> str:
+    """sha256 of a file, cached until its mtime or size changes."""
+    stat_result = stat_result or os.stat(full_path)
+    with _digests_lock:
+        cached = _digests.get(full_path)
+        if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+            _digests.move_to_end(full_path)
+            return cached[2]
+    digest = hashlib.sha256()
+    with open(full_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    with _digests_lock:
+        _digests[full_path] = (stat_result.st_mtime_ns, stat_result.st_size, digest.hexdigest())
+        _digests.move_to_end(full_path)
+        while len(_digests) > DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+    return digest.hexdigest()
+
+
+def name_digest(full_path: str) -> Optional[str]:
+    """Digest of a content-addressed upload, derived from its file name (None for other files)."""
+    name = os.path.basename(full_path)
+    if not _CONTENT_ADDRESSED.match(name):
+        return None
+    # A variant's name holds its source blob's hash; the width makes it unique
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """``Accept-Encoding`` as ``{coding: q}``; a coding listed with q=0 is refused."""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def _accepts(accepted: Dict[str, float], coding: str) -> bool:
+    return accepted.get(coding, accepted.get("*", 0.0)) > 0
+
+
+def static_url(path: str) -> str:
+    """Fingerprinted URL of a file under app/static (plain URL if it does not exist)."""
+    path = path.lstrip("/")
+    full_path = os.path.join(STATIC_DIR, *path.split("/"))
+    if not os.path.isfile(full_path):
+        return f"/static/{path}"
+    stem, ext = os.path.splitext(path)
+    return f"/static/{stem}.{content_digest(full_path)[:8]}{ext}"
+
+
+def install(templates) -> None:
+    """Expose ``static_url`` to a Jinja2Templates environment."""
+    templates.env.globals["static_url"] = static_url
+
+
+class CachedStaticFiles(StaticFiles):
+    def __init__(self, *args, immutable_paths: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_paths = re.compile(immutable_paths) if immutable_paths else None
+
+    async def get_response(self, path: str, scope) -> Response:
+        scope["asset_path"] = path
+        found = None
+        match = _FINGERPRINTED.match(path)
+        if match:
+            logical = match.group("stem") + match.group("ext")
+            found = await anyio.to_thread.run_sync(self.lookup_path, logical)
+            if found[1] is not None:
+                # A stale fingerprint still gets the current file, just not cached forever
+                scope["asset_fingerprint"] = match.group("digest")
+                path = logical
+            else:
+                found = None
+        full_path, stat_result = found or await anyio.to_thread.run_sync(self.lookup_path, path)
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            # Hash off the event loop; file_response then finds the digest in scope
+            scope["asset_digest"] = name_digest(full_path) or await anyio.to_thread.run_sync(
+                content_digest, full_path, stat_result
+            )
+        return await super().get_response(path, scope)
+
+    def _cache_control(self, scope, digest: str) -> str:
+        fingerprint = scope.get("asset_fingerprint")
+        if fingerprint and digest.startswith(fingerprint):
+            return IMMUTABLE
+        if self.immutable_paths and self.immutable_paths.match(scope.get("asset_path", "")):
+            return IMMUTABLE
+        return REVALIDATE
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        digest = scope.get("asset_digest") or name_digest(full_path) or content_digest(full_path, stat_result)
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        served_path, served_stat, encoding = full_path, stat_result, None
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        for name, suffix in ENCODINGS:
+            if not _accepts(accepted, name):
+                continue
+            try:
+                sidecar_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if sidecar_stat.st_mtime >= stat_result.st_mtime:
+                served_path, served_stat, encoding = full_path + suffix, sidecar_stat, name
+                break
+        headers = {
+            # Each encoding is a distinct representation, so it gets its own strong ETag
+            "etag": f'"{digest[:32]}{"-" + encoding if encoding else ""}"',
+            "cache-control": self._cache_control(scope, digest),
+            "vary": "Accept-Encoding",
+        }
+        if encoding:
+            headers["content-encoding"] = encoding
+        response = FileResponse(
+            served_path, status_code=status_code, stat_result=served_stat, media_type=media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
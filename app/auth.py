@@ -5,16 +5,19 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 
 from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.database import get_db
-from app.utils import verify_password
-from app import models
+from app.database import get_db, get_async_db, get_async_read_db
+from app.utils import DEFAULT_PASSWORD, verify_password_async
+from app import assets, models, user_cache
 
 
 router = APIRouter(tags=["Auth"])
 templates = Jinja2Templates(directory="app/templates")
+assets.install(templates)
 
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -36,21 +39,43 @@ def extract_token_from_request(request: Request) -> Optional[str]:
     return None
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> models.User:
+def token_payload(request: Request) -> dict:
+    """Decoded claims of the request's JWT; raises 401 when missing or invalid."""
     token = extract_token_from_request(request)
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        subject = payload.get("sub")
-        if subject is None:
+        if payload.get("sub") is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return payload
+
+
+def _memoized_user(request: Request, session: Session) -> Optional[models.User]:
+    # The principal is resolved once per request and reused while it belongs to the same session
+    user = getattr(request.state, "current_user", None)
+    if user is not None and object_session(user) is session:
+        return user
+    return None
 
-    user = db.query(models.User).filter(models.User.email == subject).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+def get_current_user(request: Request, db: Session = Depends(get_db)) -> models.User:
+    user = _memoized_user(request, db)
+    if user is not None:
+        return user
+    payload = token_payload(request)
+    key = (payload["sub"], payload.get("iat"))
+    values = user_cache.cache.get(key)
+    if values is not None:
+        user = db.merge(user_cache.detached(values), load=False)
+    else:
+        user = db.query(models.User).filter(models.User.email == payload["sub"]).first()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        user_cache.cache.put(key, user_cache.snapshot(user), payload.get("exp"))
+    request.state.current_user = user
     return user
 
 
@@ -60,21 +85,47 @@ def require_superadmin(current_user: models.User = Depends(get_current_user)) ->
     return current_user
 
 
+async def get_current_user_async(request: Request, db: AsyncSession = Depends(get_async_read_db)) -> models.User:
+    user = _memoized_user(request, db.sync_session)
+    if user is not None:
+        return user
+    payload = token_payload(request)
+    key = (payload["sub"], payload.get("iat"))
+    values = user_cache.cache.get(key)
+    if values is not None:
+        user = await db.merge(user_cache.detached(values), load=False)
+    else:
+        result = await db.execute(select(models.User).where(models.User.email == payload["sub"]).limit(1))
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        user_cache.cache.put(key, user_cache.snapshot(user), payload.get("exp"))
+    request.state.current_user = user
+    return user
+
+
+async def require_superadmin_async(current_user: models.User = Depends(get_current_user_async)) -> models.User:
+    if current_user.role != "superadmin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Superadmin access required")
+    return current_user
+
+
 @router.get("/login", response_class=HTMLResponse)
 def login_form(request: Request):
     return templates.TemplateResponse("login.html", {"request": request, "error": None})
 
 
 @router.post("/login")
-def login_submit(
+async def login_submit(
     request: Request,
     response: Response,
     email: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user or not verify_password(password, user.password_hash):
+    result = await db.execute(select(models.User).where(models.User.email == email).limit(1))
+    user = result.scalars().first()
+    if not user or not await verify_password_async(password, user.password_hash):
         return templates.TemplateResponse(
             "login.html",
             {"request": request, "error": "Invalid email or password"},
@@ -82,7 +133,11 @@ def login_submit(
         )
 
     # Force password change if default
-    must_change = verify_password("12345", user.password_hash)
+    if user.must_change_password is None:
+        # Account predates the flag: record it now that the password is known
+        user.must_change_password = password == DEFAULT_PASSWORD
+        await db.commit()
+    must_change = bool(user.must_change_password)
     token = create_access_token(subject=user.email)
     # Role-based redirect when not forcing password change
     redirect_url = "/change-password" if must_change else "/residentpanel"
@@ -101,9 +156,10 @@ def login_submit(
 
 
 @router.post("/auth/login")
-def api_login(email: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user or not verify_password(password, user.password_hash):
+async def api_login(email: str = Form(...), password: str = Form(...), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(models.User).where(models.User.email == email).limit(1))
+    user = result.scalars().first()
+    if not user or not await verify_password_async(password, user.password_hash):
         raise HTTPException(status_code=400, detail="Invalid credentials")
     token = create_access_token(subject=user.email)
     return {"access_token": token, "token_type": "bearer"}
@@ -0,0 +1,97 @@
+"""Query building and view helpers shared by the sync and async page handlers.
+
+Everything here is I/O free: statements are built as 2.0-style ``select()``
+so either a ``Session`` or an ``AsyncSession`` can execute them.
+"""
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app import images, models, search
+
+
+ALLOWED_IMAGE_EXT = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def parse_region(region: Optional[str]) -> Optional[int]:
+    if region not in (None, "") and region.isdigit():
+        return int(region)
+    return None
+
+
+def parse_price(max_price: Optional[str]) -> Optional[float]:
+    if max_price in (None, ""):
+        return None
+    try:
+        return float(max_price)
+    except ValueError:
+        return None
+
+
+def catalog_statement(region: Optional[str], city: Optional[str], max_price: Optional[str], q: Optional[str]):
+    """Buildings matching the public catalog filters."""
+    stmt = select(models.Building)
+    region_id = parse_region(region)
+    if region_id is not None:
+        stmt = stmt.where(models.Building.region_id == region_id)
+    # Free-text and city search go through the FTS index, ranked by relevance
+    stmt = search.apply_search(stmt, q, city)
+    price = parse_price(max_price)
+    if price is not None:
+        stmt = stmt.where(models.Building.price_per_m2 <= price)
+    return stmt
+
+
+def photos_statement(building_ids: Iterable[int]):
+    return select(models.BuildingPhoto).where(models.BuildingPhoto.building_id.in_(list(building_ids)))
+
+
+def free_rooms_statement(building_id: int):
+    return select(models.Room).where(models.Room.building_id == building_id, models.Room.status == "free")
+
+
+def _is_image(photo: models.BuildingPhoto) -> bool:
+    _, ext = os.path.splitext((photo.file_path or "").lower())
+    return ext in ALLOWED_IMAGE_EXT
+
+
+def attach_first_images(buildings: List[models.Building], photos: Iterable[models.BuildingPhoto]) -> None:
+    """Set ``building.image`` (and its ``image_srcset``/``image_webp_srcset``) from its first displayable photo."""
+    first_photo_by_building: Dict[int, dict] = {}
+    for p in photos:
+        if _is_image(p) and p.building_id not in first_photo_by_building:
+            first_photo_by_building[p.building_id] = images.picture(p)
+    for b in buildings:
+        pic = first_photo_by_building.get(b.id) or {}
+        setattr(b, "image", pic.get("src"))
+        setattr(b, "image_srcset", pic.get("srcset"))
+        setattr(b, "image_webp_srcset", pic.get("webp_srcset"))
+
+
+def split_gallery(photos: Iterable[models.BuildingPhoto]) -> Tuple[List[dict], List[str]]:
+    """(regular images as ``images.picture`` dicts, 360° panorama paths) for the building detail page."""
+    gallery = []
+    images_360 = []
+    for p in photos:
+        if p.is_360:
+            images_360.append(p.file_path)
+        elif _is_image(p):
+            gallery.append(images.picture(p))
+    return gallery, images_360
+
+
+def active_facilities(building: models.Building) -> List[str]:
+    return [a.name for a in (building.amenities_rel or []) if getattr(a, "is_active", True)]
+
+
+def space_rows(rooms: Iterable[models.Room]) -> List[dict]:
+    return [
+        {
+            "id": s.id,
+            "floor": s.floor,
+            "room_number": s.room_number,
+            "area": s.area,
+        }
+        for s in rooms
+    ]
@@ -0,0 +1,107 @@
+"""Conditional GETs (ETag / If-None-Match) for the JSON REST endpoints.
+
+The validator is computed from row metadata, not from the response body.
+A collection tag covers the table's change counter in ``table_versions``
+plus the request's query string, so it costs one primary-key lookup however
+large the collection is. A Session ``after_flush`` listener bumps the
+counter, on the flush's own connection, for every table with a ``version``
+column that the flush inserts into, updates or deletes from. Bulk
+``query.update()``/``delete()`` calls bypass it. An item tag covers the
+row's id, version and updated_at. ``version`` goes up on every UPDATE, so
+two edits within the same second still change the tag.
+
+If ``If-None-Match`` matches, the handler returns 304 before paginating
+or serializing anything. Otherwise the tag is set on the 200 response,
+together with ``Last-Modified`` (the time of the table's last change).
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join("" if p is None else str(p) for p in parts).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def http_date(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # SQLite CURRENT_TIMESTAMP is UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    candidates: Iterable[str] = (c.strip() for c in if_none_match.split(","))
+    return any(c == "*" or _opaque(c) == _opaque(etag) for c in candidates)
+
+
+def _respond(request: Request, response: Response, etag: str, last_modified: Optional[datetime]) -> Optional[Response]:
+    headers = {"ETag": etag}
+    modified = http_date(last_modified)
+    if modified:
+        headers["Last-Modified"] = modified
+    if matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def table_version(db: Session, table_name: str) -> Tuple[int, Optional[datetime]]:
+    """(change counter, time of the last change) of a table; (0, None) before its first write."""
+    table = models.TableVersion.__table__
+    row = db.execute(select(table.c.version, table.c.updated_at).where(table.c.table_name == table_name)).first()
+    return (row[0], row[1]) if row else (0, None)
+
+
+def collection(request: Request, response: Response, db: Session, model) -> Optional[Response]:
+    """304 response for an unchanged list of ``model``, else None (and tag ``response``)."""
+    version, last_modified = table_version(db, model.__tablename__)
+    etag = weak_etag(model.__tablename__, version, request.url.query)
+    return _respond(request, response, etag, last_modified)
+
+
+def item(request: Request, response: Response, obj) -> Optional[Response]:
+    """304 response for an unchanged row, else None (and tag ``response``)."""
+    etag = weak_etag(obj.__tablename__, obj.id, obj.version, obj.updated_at)
+    return _respond(request, response, etag, obj.updated_at)
+
+
+def _versioned(obj) -> bool:
+    table = getattr(obj, "__table__", None)
+    return table is not None and "version" in table.c
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_table_versions(session: Session, flush_context) -> None:
+    changed = {obj.__tablename__ for obj in session.new | session.deleted if _versioned(obj)}
+    changed.update(
+        obj.__tablename__ for obj in session.dirty if _versioned(obj) and session.is_modified(obj)
+    )
+    if not changed:
+        return
+    conn = session.connection()
+    table = models.TableVersion.__table__
+    now = datetime.utcnow()
+    for name in sorted(changed):
+        result = conn.execute(
+            update(table).where(table.c.table_name == name).values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            conn.execute(table.insert().values(table_name=name, version=1, updated_at=now))
@@ -6,4 +6,104 @@ SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-me")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
+# Resolved token users are cached per process (see app/user_cache.py); the
+# TTL bounds how long another worker can serve a stale role or password.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
 
+# Worker processes for password hashing (0 = one per CPU)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+
+
+
+# Pagination for list endpoints
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+# Database URLs. When DATABASE_REPLICA_URL is set, read-only endpoints are
+# served from it and writes go to DATABASE_URL.
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "")
+
+# Database engine profile: "production" applies the tuned SQLite pragmas below
+# to every new connection, "default" keeps SQLite's built-in settings.
+# Each pragma can be overridden individually, e.g. SQLITE_BUSY_TIMEOUT=10000.
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+_SQLITE_PROFILES = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": "5000",  # ms to wait on a locked database before failing
+        "mmap_size": "268435456",  # 256 MiB
+        "cache_size": "-65536",  # negative = KiB, i.e. 64 MiB per connection
+        "temp_store": "MEMORY",
+    },
+}
+SQLITE_PRAGMAS = {
+    name: os.getenv(f"SQLITE_{name.upper()}", _SQLITE_PROFILES.get(DB_PROFILE, {}).get(name))
+    for name in _SQLITE_PROFILES["production"]
+}
+SQLITE_PRAGMAS = {name: value for name, value in SQLITE_PRAGMAS.items() if value not in (None, "")}
+
+# Connection pool sizing (per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Serve the hot pages and dashboard endpoints from the async handlers in
+# app/routers/async_views.py (AsyncSession over aiosqlite); set to 0 to fall
+# back to the sync threadpool handlers.
+ASYNC_ROUTES = os.getenv("ASYNC_ROUTES", "1") not in ("0", "false", "no")
+
+# Requests with a statement at least this slow are written to the
+# "app.sql.slow" log as JSON (see app/instrumentation.py); 0 disables it.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Development check for N+1 queries: "log" or "raise" when a template
+# triggers a relationship lazy load (see app/lazy_loads.py); empty = off.
+LAZY_LOAD_CHECK = os.getenv("LAZY_LOAD_CHECK", "").lower()
+if LAZY_LOAD_CHECK not in ("", "log", "raise"):
+    raise ValueError("LAZY_LOAD_CHECK must be empty, 'log' or 'raise'")
+
+# Resized variants generated for uploaded photos (see app/images.py)
+IMAGE_VARIANT_WIDTHS = tuple(int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1280").split(",") if w.strip())
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+# Rendered catalog/building pages are cached per process (see app/page_cache.py);
+# writes invalidate them, the TTL only bounds staleness from other workers.
+# PAGE_CACHE_TTL_SECONDS=0 disables the cache.
+PAGE_CACHE_TTL_SECONDS = float(os.getenv("PAGE_CACHE_TTL_SECONDS", "300"))
+PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", "512"))
+
+# Notifications are written to an outbox table in the request's transaction
+# and fanned out by a background dispatcher (see app/outbox.py).
+# OUTBOX_CHANNELS: comma-separated "inapp" (notifications table), "file"
+# (JSON lines appended to OUTBOX_FILE_PATH) and/or "smtp" (plain SMTP, e.g.
+# a local debugging server on OUTBOX_SMTP_HOST:OUTBOX_SMTP_PORT).
+# OUTBOX_DISPATCHER=0 leaves dispatching to `python dispatch_outbox.py`.
+OUTBOX_CHANNELS = tuple(c.strip() for c in os.getenv("OUTBOX_CHANNELS", "inapp").split(",") if c.strip())
+OUTBOX_DISPATCHER = os.getenv("OUTBOX_DISPATCHER", "1") not in ("0", "false", "no")
+OUTBOX_FILE_PATH = os.getenv("OUTBOX_FILE_PATH", "notifications.log")
+OUTBOX_SMTP_HOST = os.getenv("OUTBOX_SMTP_HOST", "localhost")
+OUTBOX_SMTP_PORT = int(os.getenv("OUTBOX_SMTP_PORT", "1025"))
+OUTBOX_SMTP_FROM = os.getenv("OUTBOX_SMTP_FROM", "noreply@itpark.uz")
+OUTBOX_SMTP_TIMEOUT = float(os.getenv("OUTBOX_SMTP_TIMEOUT", "10"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "2"))
+# Delay after a local commit wakes the dispatcher, to batch bursts of events
+OUTBOX_COALESCE_SECONDS = float(os.getenv("OUTBOX_COALESCE_SECONDS", "0.2"))
+# Failed deliveries are retried after OUTBOX_RETRY_BASE_SECONDS, doubling up
+# to OUTBOX_RETRY_MAX_SECONDS; the event is marked failed after
+# OUTBOX_MAX_ATTEMPTS. Claimed events are retried by another dispatcher if
+# not finished within OUTBOX_LEASE_SECONDS. A dispatcher renews the lease on
+# the rest of its batch once half of it has passed, so it must cover at
+# least two deliveries at the channel timeouts (OUTBOX_SMTP_TIMEOUT).
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "5"))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "3600"))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+
+# Upload limits for the streaming photo upload handlers (bytes)
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(200 * 1024 * 1024)))
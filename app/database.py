@@ -1,11 +1,91 @@
-from sqlalchemy import create_engine
+import re
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import (
+    DATABASE_URL,
+    DATABASE_REPLICA_URL,
+    SQLITE_PRAGMAS,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+)
+
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            if not re.fullmatch(r"[A-Za-z0-9_-]+", str(value)):
+                raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def make_engine(url: str):
+    """Create an engine with the configured pool and, for SQLite, the pragma profile."""
+    kwargs = {}
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if url not in ("sqlite://", "sqlite:///:memory:"):
+        kwargs.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    new_engine = create_engine(url, **kwargs)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+replica_engine = make_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else engine
+
+
+def async_url(url: str) -> str:
+    """Map a sync database URL to its asyncio driver (``sqlite`` -> ``sqlite+aiosqlite``)."""
+    if url.startswith("sqlite:") or url.startswith("sqlite+pysqlite:"):
+        return "sqlite+aiosqlite:" + url.split(":", 1)[1]
+    return url
+
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
+def make_async_engine(url: str):
+    """Async counterpart of make_engine, sharing its pool sizing and pragmas."""
+    kwargs = {}
+    if url not in ("sqlite://", "sqlite:///:memory:"):
+        kwargs.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    new_engine = create_async_engine(async_url(url), **kwargs)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = make_async_engine(SQLALCHEMY_DATABASE_URL)
+async_replica_engine = make_async_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else async_engine
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica when opened read-only.
+
+    Flushes always go to the primary, so an accidental write from a
+    read-only session still lands in the right database.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and not self._flushing:
+            return replica_engine
+        return engine
+
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+# Read-only async handlers bind straight to the replica
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
@@ -18,6 +98,44 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """Session for read-only endpoints; served by the replica when one is configured."""
+    db = SessionLocal(info={"read_only": True})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """AsyncSession for the async read-only handlers (see app/routers/async_views.py)."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def sync_sqlite_replica() -> None:
+    """Copy the primary SQLite database into the replica with the online backup API.
+
+    Lets a second SQLite file stand in for a streaming replica locally.
+    """
+    if replica_engine is engine:
+        raise RuntimeError("DATABASE_REPLICA_URL is not configured")
+    if engine.dialect.name != "sqlite" or replica_engine.dialect.name != "sqlite":
+        raise RuntimeError("Backup-based replication needs SQLite on both sides")
+    src = engine.raw_connection()
+    dst = replica_engine.raw_connection()
+    try:
+        src.driver_connection.backup(dst.driver_connection)
+    finally:
+        dst.close()
+        src.close()
+
+
 def ensure_sqlite_schema():
     """Lightweight schema guard for SQLite to add missing columns when models evolve.
     Avoids full migration tooling for small MVP.
@@ -29,6 +147,8 @@ def ensure_sqlite_schema():
             columns = {row[1] for row in info}  # (cid, name, type, ...)
             if 'created_at' not in columns:
                 conn.exec_driver_sql("ALTER TABLE building_photos ADD COLUMN created_at DATETIME")
+            if 'variants' not in columns:
+                conn.exec_driver_sql("ALTER TABLE building_photos ADD COLUMN variants TEXT")
             # Add missing columns to amenities
             info_am = conn.exec_driver_sql("PRAGMA table_info('amenities')").fetchall()
             am_cols = {row[1] for row in info_am}
@@ -66,3 +186,88 @@ def ensure_sqlite_schema():
     except Exception:
         # Best-effort; continue if not SQLite or on error
         pass
+
+    # Add users.must_change_password. Existing accounts get NULL ("not checked
+    # yet"); their next successful login compares the submitted password with
+    # DEFAULT_PASSWORD and stores the result, so no KDF runs here.
+    try:
+        with engine.begin() as conn:
+            info_users = conn.exec_driver_sql("PRAGMA table_info('users')").fetchall()
+            if info_users and 'must_change_password' not in {row[1] for row in info_users}:
+                conn.exec_driver_sql("ALTER TABLE users ADD COLUMN must_change_password BOOLEAN")
+    except Exception:
+        pass
+
+    # updated_at/version columns behind the REST ETags (app/conditional.py)
+    for table, columns in (
+        ("regions", ("updated_at", "version")),
+        ("buildings", ("updated_at", "version")),
+        ("rooms", ("updated_at", "version")),
+        ("building_photos", ("updated_at", "version")),
+        ("amenities", ("version",)),
+        ("signers", ("version",)),
+    ):
+        try:
+            with engine.begin() as conn:
+                existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info('{table}')").fetchall()}
+                if not existing:
+                    continue
+                if "updated_at" in columns and "updated_at" not in existing:
+                    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME")
+                    conn.exec_driver_sql(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP")
+                if "version" not in existing:
+                    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        except Exception:
+            pass
+
+    # Approval steps and the request's current step (app/workflow.py). Existing
+    # chains are numbered in signing order; only the current step of an open
+    # request stays "pending". Later steps, and the leftovers of requests that
+    # were already approved or rejected, become "waiting".
+    try:
+        with engine.begin() as conn:
+            rr_cols = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info('rental_requests')").fetchall()}
+            ra_cols = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info('request_approvals')").fetchall()}
+            if rr_cols and ra_cols and "step" not in ra_cols:
+                conn.exec_driver_sql("ALTER TABLE request_approvals ADD COLUMN step INTEGER")
+                conn.exec_driver_sql("ALTER TABLE rental_requests ADD COLUMN current_step INTEGER")
+                conn.exec_driver_sql("ALTER TABLE rental_requests ADD COLUMN total_steps INTEGER NOT NULL DEFAULT 0")
+                chains = {}
+                for approval_id, request_id, status in conn.exec_driver_sql(
+                    "SELECT ra.id, ra.request_id, ra.status FROM request_approvals ra "
+                    "LEFT JOIN signers s ON s.id = ra.signer_id "
+                    "ORDER BY ra.request_id, s.signing_order, ra.signer_id, ra.id"
+                ).fetchall():
+                    chains.setdefault(request_id, []).append((approval_id, status))
+                open_requests = {
+                    request_id
+                    for (request_id,) in conn.exec_driver_sql(
+                        "SELECT id FROM rental_requests WHERE status IN ('pending', 'in_progress')"
+                    ).fetchall()
+                }
+                for request_id, chain in chains.items():
+                    current = None
+                    if request_id in open_requests:
+                        current = next((n for n, (_, status) in enumerate(chain, 1) if status != "approved"), None)
+                    for n, (approval_id, status) in enumerate(chain, 1):
+                        if status == "pending" and (current is None or n > current):
+                            status = "waiting"
+                        conn.exec_driver_sql(
+                            "UPDATE request_approvals SET step = ?, status = ? WHERE id = ?", (n, status, approval_id)
+                        )
+                    conn.exec_driver_sql(
+                        "UPDATE rental_requests SET current_step = ?, total_steps = ? WHERE id = ?",
+                        (current, len(chain), request_id),
+                    )
+    except Exception:
+        pass
+
+    # Indexes declared on models after a table was first created are skipped
+    # by create_all, so add any that are missing.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with engine.begin() as conn:
+                    index.create(bind=conn, checkfirst=True)
+            except Exception:
+                pass  # Table might not exist yet
@@ -0,0 +1,156 @@
+"""Resized WebP/JPEG variants of uploaded building photos.
+
+After an upload is committed, ``schedule_variants`` hands the file to a
+process pool that writes one WebP and one JPEG per configured width under
+``app/uploads/variants``. When the job finishes, the variant list is stored
+as JSON in ``BuildingPhoto.variants``. Templates then use ``srcset`` so
+browsers download the smallest file that fits the layout. Until the
+variants exist, or when Pillow is not installed, the original is served.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from app.config import IMAGE_VARIANT_WIDTHS, IMAGE_WORKERS
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow is in requirements.txt
+    Image = None
+
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_DIR = os.path.join("app", "uploads")
+VARIANTS_DIR = os.path.join(UPLOADS_DIR, "variants")
+RASTER_EXT = {".jpg", ".jpeg", ".png", ".webp"}
+
+# format name -> (Pillow format, file extension, save options)
+FORMATS = {
+    "webp": ("WEBP", ".webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", ".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def upload_file(rel_path: str) -> Optional[str]:
+    """Filesystem path of a ``/uploads/...`` URL, or None for anything else."""
+    if not rel_path or not rel_path.startswith("/uploads/"):
+        return None
+    return os.path.join(UPLOADS_DIR, *rel_path[len("/uploads/"):].split("/"))
+
+
+def _save_atomic(image, target: str, pil_format: str, options: dict) -> None:
+    """Write to a temp file beside ``target`` and rename it into place.
+
+    Jobs for the same blob can run concurrently; the rename means readers
+    only ever see a missing or a complete variant, never a partial one.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".variant-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, pil_format, **options)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def make_variants(rel_path: str, widths=IMAGE_VARIANT_WIDTHS) -> List[Dict]:
+    """Write the resized variants of one upload; runs in the image worker pool."""
+    src = upload_file(rel_path)
+    if Image is None or not src or os.path.splitext(src)[1].lower() not in RASTER_EXT:
+        return []
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(src))[0]
+    variants = []
+    with Image.open(src) as opened:
+        image = ImageOps.exif_transpose(opened).convert("RGB")
+    # Never upscale; an image narrower than every target gets one variant at its own width
+    targets = sorted({w for w in widths if w < image.width}) or [image.width]
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt, (pil_format, ext, options) in FORMATS.items():
+            name = f"{stem}_{width}w{ext}"
+            target = os.path.join(VARIANTS_DIR, name)
+            # Blobs are content-addressed, so an existing variant is already correct
+            if not os.path.exists(target):
+                _save_atomic(resized, target, pil_format, options)
+            variants.append({"format": fmt, "width": width, "height": height, "path": f"/uploads/variants/{name}"})
+    return variants
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _pool
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _record(photo_id: int, future) -> None:
+    from app.database import SessionLocal
+    from app import models
+
+    try:
+        variants = future.result()
+    except Exception:
+        logger.exception("Generating variants for photo %s failed", photo_id)
+        return
+    if not variants:
+        return
+    with SessionLocal() as db:
+        photo = db.get(models.BuildingPhoto, photo_id)
+        if photo is not None:
+            photo.variants = json.dumps(variants)
+            db.commit()
+
+
+def schedule_variants(photo) -> None:
+    """Queue variant generation for a committed BuildingPhoto (360° panoramas stay full size)."""
+    if Image is None or photo.is_360 or not upload_file(photo.file_path):
+        return
+    photo_id = photo.id
+    future = _executor().submit(make_variants, photo.file_path)
+    future.add_done_callback(lambda f: _record(photo_id, f))
+
+
+def _variants(photo) -> List[Dict]:
+    try:
+        return json.loads(photo.variants or "[]")
+    except ValueError:
+        return []
+
+
+def srcset(variants: List[Dict], fmt: str) -> str:
+    return ", ".join(f"{v['path']} {v['width']}w" for v in variants if v["format"] == fmt)
+
+
+def picture(photo) -> Dict[str, Optional[str]]:
+    """Template data for one photo: fallback ``src``, ``srcset`` (JPEG), ``webp_srcset`` and ``thumb``."""
+    variants = sorted(_variants(photo), key=lambda v: v["width"])
+    jpegs = [v for v in variants if v["format"] == "jpeg"]
+    return {
+        "src": photo.file_path,
+        "srcset": srcset(variants, "jpeg") or None,
+        "webp_srcset": srcset(variants, "webp") or None,
+        "thumb": jpegs[0]["path"] if jpegs else photo.file_path,
+    }
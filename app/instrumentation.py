@@ -0,0 +1,236 @@
+"""Per-request SQL instrumentation, slow-query log and Prometheus metrics.
+
+``SQLTimingMiddleware`` opens a ``RequestStats`` for every HTTP request.
+Engine-wide ``before/after_cursor_execute`` hooks then add each statement's
+count and duration to it. This works for the sync engines and for the async
+engines' underlying sync engines alike. When the response starts:
+
+- a ``Server-Timing`` header reports ``db`` (total DB time and statement
+  count) and ``app`` (the whole request);
+- if any statement took at least SLOW_QUERY_MS, one structured JSON record
+  goes to the ``app.sql.slow`` logger with the route, the totals and the
+  slowest statements;
+- the per-route histograms served by ``/metrics`` are updated.
+
+Bound parameters are never logged.
+"""
+import bisect
+import contextvars
+import heapq
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import SLOW_QUERY_MS
+
+
+logger = logging.getLogger("app.sql.slow")
+
+SLOWEST_KEPT = 3
+STATEMENT_LOG_CHARS = 500
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "slowest", "_lock")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slowest: List[Tuple[float, str]] = []  # min-heap of the slowest statements
+        self._lock = threading.Lock()
+
+    def add(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+            entry = (seconds, statement)
+            if len(self.slowest) < SLOWEST_KEPT:
+                heapq.heappush(self.slowest, entry)
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_sql_stats", default=None)
+
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_timer(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple, in Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            # bucket counts..., +Inf count, sum
+            series = self._series.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            label_text = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{label_text},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {values[-1]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to the start of the response.", ("method", "route"), DURATION_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.", ("method", "route"), DURATION_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+HISTOGRAMS = (REQUEST_SECONDS, REQUEST_DB_SECONDS, REQUEST_QUERIES)
+
+
+def route_label(scope) -> str:
+    """Route template (``/building/{building_id}``) rather than the raw path, to bound label cardinality."""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    if scope.get("root_path"):
+        # Mounted static apps set root_path to their mount point
+        return scope["root_path"] + "/{path}"
+    return "<unmatched>"
+
+
+def _log_slow(scope, stats: RequestStats, status: int, elapsed: float) -> None:
+    slowest = sorted(stats.slowest, reverse=True)
+    record = {
+        "event": "slow_query",
+        "method": scope["method"],
+        "route": route_label(scope),
+        "path": scope["path"],
+        "status": status,
+        "request_ms": round(elapsed * 1000, 2),
+        "queries": stats.queries,
+        "db_ms": round(stats.db_seconds * 1000, 2),
+        "threshold_ms": SLOW_QUERY_MS,
+        "slowest": [
+            {"ms": round(seconds * 1000, 2), "sql": " ".join(statement.split())[:STATEMENT_LOG_CHARS]}
+            for seconds, statement in slowest
+        ],
+    }
+    logger.warning(json.dumps(record))
+
+
+class SQLTimingMiddleware:
+    """ASGI middleware that collects ``RequestStats`` for each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - started
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"app;dur={elapsed * 1000:.1f}"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode())]
+                _finish(scope, stats, status, elapsed)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except BaseException:
+            _finish(scope, stats, status, time.perf_counter() - started)
+            raise
+        finally:
+            _current.reset(token)
+
+
+def _finish(scope, stats: RequestStats, status: int, elapsed: float) -> None:
+    if scope.get("sql_stats_recorded"):
+        return
+    scope["sql_stats_recorded"] = True
+    labels = (scope["method"], route_label(scope))
+    REQUEST_SECONDS.observe(labels, elapsed)
+    REQUEST_DB_SECONDS.observe(labels, stats.db_seconds)
+    REQUEST_QUERIES.observe(labels, stats.queries)
+    if SLOW_QUERY_MS > 0 and stats.slowest and max(stats.slowest)[0] * 1000 >= SLOW_QUERY_MS:
+        _log_slow(scope, stats, status, elapsed)
+
+
+def render_metrics() -> str:
+    """All request histograms plus the upload counters, in Prometheus text format."""
+    from app.multipart_upload import upload_metrics
+
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    uploads = upload_metrics()
+    for key, kind, help_text in (
+        ("requests", "counter", "Streamed upload requests."),
+        ("files", "counter", "Files stored from streamed uploads."),
+        ("bytes", "counter", "Bytes received by streamed uploads."),
+        ("rejected", "counter", "Upload requests rejected or aborted."),
+        ("bytes_per_second", "gauge", "Average upload throughput."),
+    ):
+        name = f"upload_{key}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {uploads[key]}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,64 @@
+"""Development check for relationship lazy loads during template rendering.
+
+Page handlers are expected to eager-load everything their template touches
+(``selectinload``/``joinedload``). With ``LAZY_LOAD_CHECK=log`` or ``raise``,
+a Session ``do_orm_execute`` listener reports every lazy load that runs while
+a template installed with ``install(templates)`` is rendering. Each such load
+is one query per row, the N+1 pattern. ``raise`` turns it into a
+``LazyLoadInTemplate`` error, for use in development and CI. The listener
+covers every relationship in app/models.py, because it watches the Session
+rather than individual attributes. Off by default.
+"""
+import contextvars
+import logging
+from typing import Optional
+
+import jinja2
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.config import LAZY_LOAD_CHECK
+
+
+logger = logging.getLogger(__name__)
+
+_rendering: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("rendering_template", default=None)
+
+
+class LazyLoadInTemplate(RuntimeError):
+    pass
+
+
+class _TrackedTemplate(jinja2.Template):
+    def render(self, *args, **kwargs):
+        token = _rendering.set(self.name or "<string>")
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            _rendering.reset(token)
+
+
+def install(templates) -> None:
+    """Track rendering of a Jinja2Templates environment (no-op unless LAZY_LOAD_CHECK is set)."""
+    if LAZY_LOAD_CHECK:
+        templates.env.template_class = _TrackedTemplate
+
+
+def _describe(state: ORMExecuteState) -> str:
+    owner = state.lazy_loaded_from
+    target = ", ".join(sorted(m.class_.__name__ for m in state.all_mappers)) or "?"
+    return f"{owner.class_.__name__}{list(owner.identity or ())} -> {target}"
+
+
+def _check(state: ORMExecuteState) -> None:
+    template = _rendering.get()
+    if template is None or state.lazy_loaded_from is None:
+        return
+    message = f"Template {template} lazy-loaded {_describe(state)}; eager-load it in the handler"
+    if LAZY_LOAD_CHECK == "raise":
+        raise LazyLoadInTemplate(message)
+    logger.warning(message)
+
+
+if LAZY_LOAD_CHECK:
+    event.listen(Session, "do_orm_execute", _check)
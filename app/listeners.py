@@ -0,0 +1,14 @@
+"""Session listeners that keep derived data in step with every ORM write.
+
+``app.models`` imports this module, so any process that can flush a model
+(the app, the root scripts, the tests) registers all of them:
+
+- ``stats``: dashboard counters in ``stat_counters``;
+- ``search``: the FTS index over the building catalog;
+- ``storage``: upload blob reference counts and file cleanup;
+- ``conditional``: the per-table ``table_versions`` counters behind the REST ETags;
+- ``page_cache`` and ``user_cache``: in-process cache invalidation;
+- ``workflow``: the cached signer chains;
+- ``outbox``: waking the notification dispatcher.
+"""
+from app import conditional, outbox, page_cache, search, stats, storage, user_cache, workflow  # noqa: F401
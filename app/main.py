@@ -1,32 +1,56 @@
-from fastapi import FastAPI, Depends, Request, HTTPException, Form, File, UploadFile
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Depends, Request, HTTPException, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
 from app.routers import buildings, contracts, users
 from app.routers import regions, rooms, building_photos, approvals, dashboard, amenities
-from app.routers import signers
-from app.database import Base, engine, get_db, ensure_sqlite_schema
-from sqlalchemy.orm import Session
-from app import models
+from app.routers import signers, admin_data, async_views, metrics, rental_requests, request_approvals
+from app.database import Base, engine, get_db, ensure_sqlite_schema, SessionLocal
+from sqlalchemy.orm import Session, selectinload
+from app import models, stats, search, catalog, assets, multipart_upload, page_cache, lazy_loads
+from app import outbox, pages, schemas, workflow
+from app.assets import CachedStaticFiles
+from app.instrumentation import SQLTimingMiddleware
+from app.config import ASYNC_ROUTES, OUTBOX_DISPATCHER
+from app.utils import DEFAULT_PASSWORD, shutdown_hash_pool
+from app import images as image_variants
 from datetime import datetime
 from typing import List as _List
-import os
-import shutil
-import time
 from app.auth import router as auth_router, require_superadmin, get_current_user
 
 # create database tables and ensure minimal schema updates
 Base.metadata.create_all(bind=engine)
 ensure_sqlite_schema()
+with SessionLocal() as _db:
+    stats.ensure_initialized(_db)
+search.ensure_search_index(engine)
 
 app = FastAPI(title="Rent Platform MVP")
+app.add_event_handler("shutdown", shutdown_hash_pool)
+app.add_event_handler("shutdown", image_variants.shutdown_image_pool)
+if OUTBOX_DISPATCHER:
+    # Fans notification events out to the delivery channels (app/outbox.py)
+    app.add_event_handler("startup", outbox.dispatcher.start)
+    app.add_event_handler("shutdown", outbox.dispatcher.stop)
+# SQL count/time per request -> Server-Timing, slow-query log and /metrics
+app.add_middleware(SQLTimingMiddleware)
 
 # static and templates
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="app/static"), name="static")
 templates = Jinja2Templates(directory="app/templates")
-app.mount("/uploads", StaticFiles(directory="app/uploads"), name="uploads")
+assets.install(templates)
+lazy_loads.install(templates)
+# Content-addressed blobs and their variants never change, so they are cached forever
+app.mount(
+    "/uploads",
+    CachedStaticFiles(directory="app/uploads", immutable_paths=r"(blobs/|variants/[0-9a-f]{64}_)"),
+    name="uploads",
+)
 
 # routers
+if ASYNC_ROUTES:
+    # async hot paths first so they shadow the sync handlers on the same paths
+    app.include_router(async_views.router)
 app.include_router(buildings.router)
 app.include_router(contracts.router)
 app.include_router(users.router)
@@ -38,6 +62,10 @@ app.include_router(dashboard.router)
 app.include_router(auth_router)
 app.include_router(amenities.router)
 app.include_router(signers.router)
+app.include_router(admin_data.router)
+app.include_router(metrics.router)
+app.include_router(rental_requests.router)
+app.include_router(request_approvals.router)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -46,123 +74,49 @@ def index(
     region: str | None = None,
     city: str | None = None,
     max_price: str | None = None,
+    q: str | None = None,
     db: Session = Depends(get_db),
 ):
-    regions_list = db.query(models.Region).all()
-
-    query = db.query(models.Building)
-    # Parse and apply region filter
-    if region not in (None, ""):
-        try:
-            region_id = int(region)
-            query = query.filter(models.Building.region_id == region_id)
-        except ValueError:
-            pass
-    if city:
-        query = query.filter(models.Building.city.contains(city))
-    # Parse and apply max_price filter
-    if max_price not in (None, ""):
-        try:
-            max_price_value = float(max_price)
-            query = query.filter(models.Building.price_per_m2 <= max_price_value)
-        except ValueError:
-            pass
+    key = page_cache.catalog_key(region, city, max_price, q)
+    cached = page_cache.cache.get(key)
+    if cached is not None:
+        return cached
+    generation = page_cache.cache.generation
 
-    buildings_list = query.all()
+    regions_list = db.query(models.Region).all()
+    buildings_list = db.execute(catalog.catalog_statement(region, city, max_price, q)).scalars().all()
 
-    # Attach first photo path per building for display
+    # First photo per building for display
     building_ids = [b.id for b in buildings_list]
-    if building_ids:
-        photos = (
-            db.query(models.BuildingPhoto)
-            .filter(models.BuildingPhoto.building_id.in_(building_ids))
-            .all()
-        )
-        first_photo_by_building: dict[int, str] = {}
-        allowed_ext = {".jpg", ".jpeg", ".png", ".webp"}
-        for p in photos:
-            # filter by allowed image extensions
-            path = (p.file_path or "").lower()
-            _, ext = os.path.splitext(path)
-            if ext not in allowed_ext:
-                continue
-            if p.building_id not in first_photo_by_building:
-                first_photo_by_building[p.building_id] = p.file_path
-        for b in buildings_list:
-            setattr(b, "image", first_photo_by_building.get(b.id))
+    photos = db.execute(catalog.photos_statement(building_ids)).scalars().all() if building_ids else []
 
-    return templates.TemplateResponse(
+    response = templates.TemplateResponse(
         "index.html",
-        {
-            "request": request,
-            "regions": regions_list,
-            "selected_region": int(region) if region not in (None, "") and region.isdigit() else None,
-            "selected_city": city,
-            "selected_price": float(max_price) if max_price not in (None, "") else None,
-            "buildings": buildings_list,
-            "current_year": datetime.utcnow().year,
-        },
+        {"request": request, **pages.index_page(regions_list, buildings_list, photos, region, city, max_price, q)},
     )
+    return page_cache.cache.put(key, response, generation)
 
 
 @app.get("/building/{building_id}", response_class=HTMLResponse)
 def building_detail_page(building_id: int, request: Request, db: Session = Depends(get_db)):
-    building = db.get(models.Building, building_id)
+    key = page_cache.building_key(building_id)
+    cached = page_cache.cache.get(key)
+    if cached is not None:
+        return cached
+    generation = page_cache.cache.generation
+
+    building = db.get(models.Building, building_id, options=[selectinload(models.Building.amenities_rel)])
     if not building:
         return RedirectResponse(url="/", status_code=302)
 
-    # Images
-    photos = db.query(models.BuildingPhoto).filter(models.BuildingPhoto.building_id == building_id).all()
-    allowed_ext = {".jpg", ".jpeg", ".png", ".webp"}
-    images = []
-    images_360 = []
-    for p in photos:
-        path = (p.file_path or "").lower()
-        _, ext = os.path.splitext(path)
-        if p.is_360:
-            images_360.append(p.file_path)
-        elif ext in allowed_ext:
-            images.append(p.file_path)
-
-    # Facilities (amenities)
-    facilities = []
-    try:
-        facilities = [a.name for a in (building.amenities_rel or []) if getattr(a, "is_active", True)]
-    except Exception:
-        pass
-
+    photos = db.execute(catalog.photos_statement([building_id])).scalars().all()
     # Available spaces (rooms with status free)
-    spaces = (
-        db.query(models.Room)
-        .filter(models.Room.building_id == building_id, models.Room.status == "free")
-        .all()
-    )
-    available_spaces = [
-        {
-            "id": s.id,
-            "floor": s.floor,
-            "room_number": s.room_number,
-            "area": s.area,
-        }
-        for s in spaces
-    ]
-
-    # Nearby places placeholder (inject real data if available)
-    nearby_places = []
+    spaces = db.execute(catalog.free_rooms_statement(building_id)).scalars().all()
 
-    return templates.TemplateResponse(
-        "building_detail.html",
-        {
-            "request": request,
-            "building": building,
-            "images": images,
-            "images_360": images_360,
-            "facilities": facilities,
-            "nearby_places": nearby_places,
-            "available_spaces": available_spaces,
-            "current_year": datetime.utcnow().year,
-        },
+    response = templates.TemplateResponse(
+        "building_detail.html", {"request": request, **pages.building_page(building, photos, spaces)}
     )
+    return page_cache.cache.put(key, response, generation)
 
 
 # Resident Panel
@@ -173,65 +127,35 @@ def resident_panel(request: Request, db: Session = Depends(get_db)):
     except HTTPException:
         return RedirectResponse(url="/login", status_code=302)
 
-    buildings_list = db.query(models.Building).all()
-    my_requests = (
-        db.query(models.RentalRequest)
-        .filter(models.RentalRequest.user_id == current_user.id)
-        .order_by(models.RentalRequest.created_at.desc())
-        .all()
-    )
-    my_contracts = (
-        db.query(models.Contract)
-        .filter(models.Contract.user_id == current_user.id)
-        .order_by(models.Contract.created_at.desc())
-        .all()
-    )
-    notes = (
-        db.query(models.Notification)
-        .filter(models.Notification.user_id == current_user.id)
-        .order_by(models.Notification.created_at.desc())
-        .limit(20)
-        .all()
-    )
-    return templates.TemplateResponse(
-        "resident_panel.html",
-        {
-            "request": request,
-            "buildings": buildings_list,
-            "requests": my_requests,
-            "contracts": my_contracts,
-            "notifications": notes,
-            "current_user": current_user,
-            "current_year": datetime.utcnow().year,
-        },
+    context = pages.resident_page(
+        current_user,
+        db.query(models.Building).all(),
+        db.execute(pages.resident_requests_statement(current_user.id)).scalars(),
+        db.execute(pages.resident_contracts_statement(current_user.id)).scalars(),
+        db.execute(pages.notifications_statement(current_user.id)).scalars(),
     )
+    return templates.TemplateResponse("resident_panel.html", {"request": request, **context})
 
 
 # Signer Panel
 @app.get("/signerpanel", response_class=HTMLResponse)
-def signer_panel(request: Request, db: Session = Depends(get_db)):
+def signer_panel(
+    request: Request,
+    status: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    before: str | None = None,
+    db: Session = Depends(get_db),
+):
     try:
         current_user = get_current_user(request, db)
     except HTTPException:
         return RedirectResponse(url="/login", status_code=302)
-    signer = db.query(models.Signer).filter(models.Signer.email == current_user.email).first()
-    approvals = []
-    if signer:
-        approvals = (
-            db.query(models.RequestApproval)
-            .filter(models.RequestApproval.signer_id == signer.id)
-            .order_by(models.RequestApproval.id.desc())
-            .all()
-        )
+    signer = db.execute(pages.signer_statement(current_user.email)).scalars().first()
+    filters = workflow.panel_filters(status, date_from, date_to, before)
+    rows = db.execute(workflow.panel_statement(signer.id, filters)).all() if signer else []
     return templates.TemplateResponse(
-        "signer_panel.html",
-        {
-            "request": request,
-            "approvals": approvals,
-            "signer": signer,
-            "current_user": current_user,
-            "current_year": datetime.utcnow().year,
-        },
+        "signer_panel.html", {"request": request, **pages.signer_page(current_user, signer, rows, filters)}
     )
 
 
@@ -249,76 +173,27 @@ def create_rental_request(
     except HTTPException:
         return RedirectResponse(url="/login", status_code=302)
 
-    rr = models.RentalRequest(
-        user_id=current_user.id,
-        building_id=building_id,
-        selected_spaces=selected_spaces,
-        total_price=total_price,
-        status="pending",
-    )
-    db.add(rr)
-    db.commit()
-    db.refresh(rr)
-
-    # Determine signers chain by region
-    building = db.get(models.Building, building_id)
-    chain = (
-        db.query(models.Signer)
-        .filter((models.Signer.region_id == building.region_id) | (models.Signer.region_id.is_(None)))
-        .order_by(models.Signer.signing_order.asc())
-        .all()
-    )
-    for s in chain:
-        ra = models.RequestApproval(request_id=rr.id, signer_id=s.id, status="pending")
-        db.add(ra)
-    db.commit()
-
-    # Notify resident
-    note = models.Notification(user_id=current_user.id, title="Request submitted", message=f"Rental request #{rr.id} submitted.")
-    db.add(note)
-    db.commit()
+    item = schemas.RentalRequestSubmit(building_id=building_id, selected_spaces=selected_spaces, total_price=total_price)
+    try:
+        workflow.submit_requests(db, current_user, [item])
+    except HTTPException:
+        return RedirectResponse(url="/residentpanel?error=building_not_found", status_code=303)
     return RedirectResponse(url="/residentpanel?msg=request_submitted", status_code=303)
 
 
-# Signer actions: approve/decline
+# Signer actions: approve/decline (state machine in app/workflow.py)
 @app.post("/request-approvals/{approval_id}/approve")
 def approve_request(approval_id: int, request: Request, comment: str | None = Form(None), db: Session = Depends(get_db)):
     try:
         current_user = get_current_user(request, db)
     except HTTPException:
         return RedirectResponse(url="/login", status_code=302)
-    ra = db.get(models.RequestApproval, approval_id)
-    if not ra:
-        return RedirectResponse(url="/signerpanel?error=not_found", status_code=303)
-    ra.status = "approved"
-    ra.action_at = datetime.utcnow()
-    if comment:
-        ra.reason = comment
-    db.add(ra)
+    try:
+        workflow.approve(db, current_user, approval_id, comment)
+    except HTTPException as exc:
+        db.rollback()
+        return RedirectResponse(url=f"/signerpanel?error={workflow.ERROR_CODES[exc.status_code]}", status_code=303)
     db.commit()
-
-    # If all approvals approved -> create final Contract and notify resident
-    remaining = (
-        db.query(models.RequestApproval)
-        .filter(models.RequestApproval.request_id == ra.request_id, models.RequestApproval.status != "approved")
-        .count()
-    )
-    if remaining == 0:
-        req = db.get(models.RentalRequest, ra.request_id)
-        if req:
-            req.status = "approved"
-            db.add(req)
-            contract = models.Contract(
-                building_id=req.building_id,
-                user_id=req.user_id,
-                selected_rooms=req.selected_spaces,
-                total_price=req.total_price,
-                zero_risk=False,
-                status="approved",
-            )
-            db.add(contract)
-            db.add(models.Notification(user_id=req.user_id, title="Request approved", message=f"Your request #{req.id} is approved. Contract created."))
-            db.commit()
     return RedirectResponse(url="/signerpanel?msg=approved", status_code=303)
 
 
@@ -328,21 +203,12 @@ def decline_request(approval_id: int, request: Request, reason: str = Form(...),
         current_user = get_current_user(request, db)
     except HTTPException:
         return RedirectResponse(url="/login", status_code=302)
-    ra = db.get(models.RequestApproval, approval_id)
-    if not ra:
-        return RedirectResponse(url="/signerpanel?error=not_found", status_code=303)
-    ra.status = "declined"
-    ra.reason = reason
-    ra.action_at = datetime.utcnow()
-    db.add(ra)
+    try:
+        workflow.decline(db, current_user, approval_id, reason)
+    except HTTPException as exc:
+        db.rollback()
+        return RedirectResponse(url=f"/signerpanel?error={workflow.ERROR_CODES[exc.status_code]}", status_code=303)
     db.commit()
-    # Mark request rejected
-    req = db.get(models.RentalRequest, ra.request_id)
-    if req:
-        req.status = "rejected"
-        db.add(req)
-        db.add(models.Notification(user_id=req.user_id, title="Request declined", message=f"Your request #{req.id} was declined: {reason}"))
-        db.commit()
     return RedirectResponse(url="/signerpanel?msg=declined", status_code=303)
 
 
@@ -355,16 +221,7 @@ def admin_dashboard(request: Request, db: Session = Depends(get_db)):
     except HTTPException:
         return RedirectResponse(url="/login", status_code=302)
 
-    regions_list = db.query(models.Region).all()
-    amenities_list = db.query(models.Amenity).all()
-    users_list = db.query(models.User).all()
-    buildings_list = db.query(models.Building).all()
-    rooms_list = db.query(models.Room).all()
-    photos_list = db.query(models.BuildingPhoto).all()
-    contracts_list = db.query(models.Contract).all()
-    approvals_list = db.query(models.Approval).all()
-    signers_list = db.query(models.Signer).order_by(models.Signer.signing_order.asc()).all()
-
+    # Table data is fetched per tab from /admin/data/{table}
     msg = request.query_params.get("msg")
     error = request.query_params.get("error")
     return templates.TemplateResponse(
@@ -372,15 +229,6 @@ def admin_dashboard(request: Request, db: Session = Depends(get_db)):
         {
             "request": request,
             "current_user": current_user,
-            "regions": regions_list,
-            "users": users_list,
-            "buildings": buildings_list,
-            "rooms": rooms_list,
-            "photos": photos_list,
-            "amenities": amenities_list,
-            "contracts": contracts_list,
-            "approvals": approvals_list,
-            "signers": signers_list,
             "current_year": datetime.utcnow().year,
             "msg": msg,
             "error": error,
@@ -464,11 +312,12 @@ def change_password_submit(
     new_password: str = Form(...),
     db: Session = Depends(get_db),
 ):
-    from app.utils import verify_password, hash_password
+    from app.utils import pooled_verify_password, pooled_hash_password
     user = db.query(models.User).filter(models.User.email == email).first()
-    if not user or not verify_password(old_password, user.password_hash):
+    if not user or not pooled_verify_password(old_password, user.password_hash):
         return templates.TemplateResponse("change_password.html", {"request": request, "error": "Invalid email or password"}, status_code=400)
-    user.password_hash = hash_password(new_password)
+    user.password_hash = pooled_hash_password(new_password)
+    user.must_change_password = new_password == DEFAULT_PASSWORD
     db.add(user)
     db.commit()
     return RedirectResponse(url="/login", status_code=302)
@@ -537,13 +386,14 @@ def admin_create_signer(
         if existing:
             return RedirectResponse(url="/signers?error=signing_order_in_use", status_code=303)
     # Ensure user account exists and has signer role
-    from app.utils import hash_password
+    from app.utils import pooled_hash_password
     user_acc = db.query(models.User).filter(models.User.email == email).first()
     if not user_acc:
         user_acc = models.User(
             name=name,
             email=email,
-            password_hash=hash_password("12345"),
+            password_hash=pooled_hash_password(DEFAULT_PASSWORD),
+            must_change_password=True,
             role="signer",
             region_id=region_id_val,
         )
@@ -704,12 +554,13 @@ def admin_create_user(
             data_region_id = int(region_id)
         except ValueError:
             data_region_id = None
-    from app.utils import hash_password
+    from app.utils import pooled_hash_password
 
     new_user = models.User(
         name=name,
         email=email,
-        password_hash=hash_password(password),
+        password_hash=pooled_hash_password(password),
+        must_change_password=password == DEFAULT_PASSWORD,
         role=role,
         region_id=data_region_id,
     )
@@ -732,39 +583,37 @@ def admin_delete_user(request: Request, id: int = Form(...), db: Session = Depen
 
 # Buildings (admin)
 @app.post("/admin/buildings")
-def admin_create_building(
-    request: Request,
-    name: str = Form(...),
-    address: str = Form(...),
-    city: str = Form(...),
-    region_id: int = Form(...),
-    floors: int = Form(...),
-    total_area: float = Form(...),
-    price_per_m2: float = Form(...),
-    amenity_ids: _List[int] | None = Form(None),
-    images: _List[UploadFile] | None = File(None),
-    db: Session = Depends(get_db),
-):
-    user = _ensure_superadmin(request, db)
+async def admin_create_building(request: Request, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_ensure_superadmin, request, db)
     if not user:
         return RedirectResponse(url="/login", status_code=302)
-    b = models.Building(
-        name=name,
-        address=address,
-        city=city,
-        region_id=region_id,
-        floors=floors,
-        total_area=total_area,
-        price_per_m2=price_per_m2,
-    )
+    # Images stream to disk while the form is parsed; they enter the blob
+    # store only once the fields are valid, and are deleted otherwise
+    with await multipart_upload.parse_upload_form(request) as form:
+        fields = {
+            "name": form.require("name"),
+            "address": form.require("address"),
+            "city": form.require("city"),
+            "region_id": form.require("region_id", int),
+            "floors": form.require("floors", int),
+            "total_area": form.require("total_area", float),
+            "price_per_m2": form.require("price_per_m2", float),
+        }
+        image_urls = [f.url for f in form.store("images")]
+    photos = await run_in_threadpool(_save_new_building, db, fields, form.getlist("amenity_ids"), image_urls)
+    for photo in photos:
+        image_variants.schedule_variants(photo)
+    return RedirectResponse(url="/admin", status_code=302)
+
+
+def _save_new_building(db: Session, fields: dict, amenity_ids: _List[str], image_urls: _List[str]):
+    b = models.Building(**fields)
     db.add(b)
     db.commit()
     # Attach selected amenities
     if amenity_ids:
-        # amenity_ids from form can be a single str or list[str]
-        ids = amenity_ids if isinstance(amenity_ids, list) else [amenity_ids]
         try:
-            ids = [int(i) for i in ids]
+            ids = [int(i) for i in amenity_ids]
         except Exception:
             ids = []
         if ids:
@@ -772,23 +621,17 @@ def admin_create_building(
             b.amenities_rel = selected
             db.add(b)
             db.commit()
-    if images:
-        uploads_dir = os.path.join("app", "uploads")
-        os.makedirs(uploads_dir, exist_ok=True)
-        for file in images:
-            if not file or not file.filename:
-                continue
-            original_name = os.path.basename(file.filename)
-            base_name = original_name.replace(" ", "_")
-            unique_name = f"{int(time.time()*1000)}_{base_name}"
-            dst_path = os.path.join(uploads_dir, unique_name)
-            with open(dst_path, "wb") as out_file:
-                shutil.copyfileobj(file.file, out_file)
-            rel_path = f"/uploads/{unique_name}"
+    photos = []
+    if image_urls:
+        for rel_path in image_urls:
             photo = models.BuildingPhoto(building_id=b.id, file_path=rel_path, is_360=False)
             db.add(photo)
+            photos.append(photo)
         db.commit()
-    return RedirectResponse(url="/admin", status_code=302)
+        # Load ids before leaving the threadpool; variant scheduling reads them
+        for photo in photos:
+            db.refresh(photo)
+    return photos
 
 
 @app.post("/admin/buildings/delete")
@@ -860,41 +703,32 @@ def admin_create_photo(
     p = models.BuildingPhoto(building_id=building_id, file_path=file_path, is_360=is_360_value)
     db.add(p)
     db.commit()
+    image_variants.schedule_variants(p)
     return RedirectResponse(url="/admin", status_code=302)
 
 
 @app.post("/admin/photos/upload")
-def admin_upload_photo(
-    request: Request,
-    building_id: int = Form(...),
-    file: UploadFile = File(...),
-    is_360: str | None = Form(None),
-    db: Session = Depends(get_db),
-):
-    user = _ensure_superadmin(request, db)
+async def admin_upload_photo(request: Request, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_ensure_superadmin, request, db)
     if not user:
         return RedirectResponse(url="/login", status_code=302)
 
-    # Ensure uploads directory exists
-    uploads_dir = os.path.join("app", "uploads")
-    os.makedirs(uploads_dir, exist_ok=True)
-
-    # Generate safe unique filename
-    original_name = os.path.basename(file.filename or "upload")
-    base_name = original_name.replace(" ", "_")
-    unique_name = f"{int(time.time()*1000)}_{base_name}"
-    dst_path = os.path.join(uploads_dir, unique_name)
+    # Stream into the content-addressed store; identical files share one blob
+    with await multipart_upload.parse_upload_form(request) as form:
+        building_id = form.require("building_id", int)
+        if not form.files.get("file"):
+            raise HTTPException(status_code=422, detail="Field 'file' is required")
+        stored = form.store("file", limit=1)
+    photo = models.BuildingPhoto(building_id=building_id, file_path=stored[0].url, is_360=bool(form.get("is_360")))
+    await run_in_threadpool(_save_photo, db, photo)
+    image_variants.schedule_variants(photo)
+    return RedirectResponse(url="/admin", status_code=302)
 
-    # Save file to disk
-    with open(dst_path, "wb") as out_file:
-        shutil.copyfileobj(file.file, out_file)
 
-    # Store relative path for serving via /uploads
-    rel_path = f"/uploads/{unique_name}"
-    photo = models.BuildingPhoto(building_id=building_id, file_path=rel_path, is_360=bool(is_360))
+def _save_photo(db: Session, photo: models.BuildingPhoto) -> None:
     db.add(photo)
     db.commit()
-    return RedirectResponse(url="/admin", status_code=302)
+    db.refresh(photo)
 
 
 @app.post("/admin/photos/delete")
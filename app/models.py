@@ -1,14 +1,21 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, Text, DateTime, Table
+from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, Text, DateTime, Table, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+
+def row_version():
+    """Counter bumped by every UPDATE of the row; feeds the REST ETags (app/conditional.py)."""
+    return Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
+
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     email = Column(String, unique=True, index=True)
     password_hash = Column(String)
+    must_change_password = Column(Boolean, default=False)  # still on DEFAULT_PASSWORD; NULL until the next login
     role = Column(String)  # superadmin, admin, resident, signer
     region_id = Column(Integer, ForeignKey("regions.id"))
 
@@ -21,6 +28,8 @@ class Region(Base):
     __tablename__ = "regions"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    version = row_version()
 
     # Relationships
     users = relationship("User", back_populates="region")
@@ -28,6 +37,9 @@ class Region(Base):
 
 class Building(Base):
     __tablename__ = "buildings"
+    __table_args__ = (
+        Index("ix_buildings_region_price", "region_id", "price_per_m2"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     address = Column(String)
@@ -37,6 +49,8 @@ class Building(Base):
     total_area = Column(Float)
     price_per_m2 = Column(Float)
     amenities = Column(Text)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    version = row_version()
 
     # Relationships
     region = relationship("Region", back_populates="buildings")
@@ -47,12 +61,17 @@ class Building(Base):
 
 class Room(Base):
     __tablename__ = "rooms"
+    __table_args__ = (
+        Index("ix_rooms_building_status", "building_id", "status"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     building_id = Column(Integer, ForeignKey("buildings.id"))
     floor = Column(Integer)
     room_number = Column(String)
     area = Column(Float)
     status = Column(String)  # free, booked
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    version = row_version()
 
     # Relationships
     building = relationship("Building", back_populates="rooms")
@@ -60,15 +79,28 @@ class Room(Base):
 class BuildingPhoto(Base):
     __tablename__ = "building_photos"
     id = Column(Integer, primary_key=True, index=True)
-    building_id = Column(Integer, ForeignKey("buildings.id"))
+    building_id = Column(Integer, ForeignKey("buildings.id"), index=True)
     file_path = Column(String)
     is_360 = Column(Boolean, default=False)
+    variants = Column(Text)  # JSON list of resized WebP/JPEG files, see app/images.py
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    version = row_version()
 
     # Relationships
     building = relationship("Building", back_populates="photos")
 
 
+class UploadBlob(Base):
+    """A stored upload, named by its content hash (see app/storage.py)."""
+    __tablename__ = "upload_blobs"
+    path = Column(String, primary_key=True)  # /uploads/blobs/<aa>/<bb>/<sha256><ext>
+    sha256 = Column(String, index=True, nullable=False)
+    size = Column(Integer)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+
+
 # Association table for many-to-many between buildings and amenities
 building_amenities = Table(
     "building_amenities",
@@ -86,6 +118,7 @@ class Amenity(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    version = row_version()
 
     buildings = relationship("Building", secondary="building_amenities", back_populates="amenities_rel")
 
@@ -121,6 +154,9 @@ class Approval(Base):
 
 class Signer(Base):
     __tablename__ = "signers"
+    __table_args__ = (
+        Index("ix_signers_region_order", "region_id", "signing_order"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     position = Column(String)
@@ -131,6 +167,7 @@ class Signer(Base):
     status = Column(String, default="active")  # active / inactive
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    version = row_version()
 
     # Relationships
     region = relationship("Region")
@@ -158,6 +195,8 @@ class RentalRequest(Base):
     selected_spaces = Column(Text)  # JSON of selected floors/rooms
     total_price = Column(Float)
     status = Column(String, default="pending")  # pending, in_progress, approved, rejected
+    current_step = Column(Integer)  # step awaiting a decision; NULL once approved/rejected
+    total_steps = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, server_default=func.now())
 
     user = relationship("User")
@@ -166,10 +205,17 @@ class RentalRequest(Base):
 
 class RequestApproval(Base):
     __tablename__ = "request_approvals"
+    __table_args__ = (
+        Index("ix_request_approvals_request_status", "request_id", "status"),
+        Index("ix_request_approvals_request_step", "request_id", "step"),
+        # Signer panel: status == "pending" only on the current step; id for keyset pages
+        Index("ix_request_approvals_signer_status_id", "signer_id", "status", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     request_id = Column(Integer, ForeignKey("rental_requests.id"))
-    signer_id = Column(Integer, ForeignKey("signers.id"))
-    status = Column(String, default="pending")  # pending/approved/declined
+    signer_id = Column(Integer, ForeignKey("signers.id"), index=True)
+    step = Column(Integer)  # 1-based position in the request's signer chain
+    status = Column(String, default="pending")  # waiting/pending/approved/declined
     action_at = Column(DateTime)
     reason = Column(Text)
 
@@ -179,6 +225,9 @@ class RequestApproval(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String)
@@ -187,3 +236,47 @@ class Notification(Base):
     created_at = Column(DateTime, server_default=func.now())
 
     user = relationship("User")
+
+
+class OutboxEvent(Base):
+    """A notification waiting to be fanned out to the delivery channels (app/outbox.py)."""
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index("ix_outbox_events_status_due", "status", "next_attempt_at"),
+        Index("ix_outbox_events_claimed_by", "claimed_by"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # request.submitted, request.approved, ...
+    user_id = Column(Integer, ForeignKey("users.id"))  # recipient
+    payload = Column(Text, nullable=False)  # JSON: title, message and event data
+    status = Column(String, nullable=False, default="pending")  # pending / delivered / failed
+    delivered_channels = Column(String, nullable=False, default="", server_default="")  # comma-separated
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=False)
+    claimed_by = Column(String)  # dispatcher pass holding the lease
+    last_error = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+    delivered_at = Column(DateTime)
+
+
+class TableVersion(Base):
+    """Change counter per table, bumped by app.conditional on every flush that writes the table."""
+    __tablename__ = "table_versions"
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime)
+
+
+class StatCounter(Base):
+    """Denormalized row counts maintained by app.stats on every flush.
+
+    status is "" for metrics without one.
+    """
+    __tablename__ = "stat_counters"
+    metric = Column(String, primary_key=True)
+    status = Column(String, primary_key=True, default="")
+    value = Column(Integer, nullable=False, default=0)
+
+
+# Registered last: the listener modules import the models above
+from app import listeners  # noqa: E402,F401
@@ -0,0 +1,275 @@
+"""Streaming multipart/form-data parsing for photo uploads.
+
+Starlette's ``request.form()`` spools every file to a temporary file before
+the handler runs, and the handler then copies it again. ``parse_upload_form``
+instead feeds the request body through python-multipart as it arrives and
+writes each file part straight into the blob store (app/storage.py).
+Memory stays constant no matter how many or how large the files are.
+
+Each file part is checked against the image magic bytes in its first bytes
+and against the size limits while it streams, so a bad upload is rejected
+before the rest of the body is read. Rejections use 413 (too large) or 415
+(not an image).
+
+A finished file part stays in its temp file until the handler has validated
+the form and calls ``form.store(name)``. Used as a context manager, the form
+deletes every part that was not stored, so a rejected request leaves no
+unreferenced blobs behind.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import anyio
+from fastapi import HTTPException, Request
+
+from app import storage
+from app.config import UPLOAD_MAX_FILE_BYTES, UPLOAD_MAX_REQUEST_BYTES
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    import multipart
+    from multipart.multipart import parse_options_header
+
+
+logger = logging.getLogger(__name__)
+
+MAX_FIELD_BYTES = 64 * 1024
+SNIFF_BYTES = 12
+
+
+def sniff_image(head: bytes) -> Optional[str]:
+    """File extension for JPEG/PNG/WebP content, judged by magic bytes."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+class StoredFile:
+    def __init__(self, url: str, filename: str, size: int):
+        self.url = url
+        self.filename = filename
+        self.size = size
+
+
+class PendingFile:
+    """A fully received, validated file part not yet moved into the blob store."""
+
+    def __init__(self, writer: storage.BlobWriter, ext: str, filename: str):
+        self.writer = writer
+        self.ext = ext
+        self.filename = filename
+        self.size = writer.size
+
+
+class UploadForm:
+    """Text fields and received files of a streamed form."""
+
+    def __init__(self):
+        self.fields: Dict[str, List[str]] = {}
+        self.files: Dict[str, List[PendingFile]] = {}
+
+    def __enter__(self) -> "UploadForm":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.discard()
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        values = self.fields.get(name)
+        return values[0] if values else default
+
+    def getlist(self, name: str) -> List[str]:
+        return self.fields.get(name, [])
+
+    def require(self, name: str, convert: Callable = str):
+        value = self.get(name)
+        if value in (None, ""):
+            raise HTTPException(status_code=422, detail=f"Field '{name}' is required")
+        try:
+            return convert(value)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid value for '{name}'")
+
+    def store(self, name: str, limit: Optional[int] = None) -> List[StoredFile]:
+        """Move the files of field ``name`` (at most ``limit``) into the blob store."""
+        pending = self.files.pop(name, [])
+        if limit is not None:
+            pending, self.files[name] = pending[:limit], pending[limit:]
+        return [StoredFile(f.writer.commit(f.ext), f.filename, f.size) for f in pending]
+
+    def discard(self) -> None:
+        """Delete every received file that was not stored."""
+        for pending in self.files.values():
+            for f in pending:
+                f.writer.abort()
+        self.files.clear()
+
+
+class _FormStream:
+    """python-multipart callbacks that route file parts into BlobWriters."""
+
+    def __init__(self, form: UploadForm, max_file_bytes: int):
+        self.form = form
+        self.max_file_bytes = max_file_bytes
+        self.header_field = b""
+        self.header_value = b""
+        self.headers: Dict[bytes, bytes] = {}
+        self.name = ""
+        self.filename: Optional[str] = None
+        self.field_data = bytearray()
+        self.writer: Optional[storage.BlobWriter] = None
+        self.head = b""
+        self.ext: Optional[str] = None
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self.headers = {}
+        self.field_data = bytearray()
+        self.head = b""
+        self.ext = None
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self.header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self.headers[self.header_field.lower()] = self.header_value
+        self.header_field = b""
+        self.header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        self.name = options.get(b"name", b"").decode("latin-1")
+        filename = options.get(b"filename")
+        self.filename = filename.decode("utf-8", "replace") if filename is not None else None
+        # Browsers send an empty, nameless part for a file input left blank
+        self.writer = storage.BlobWriter() if self.filename else None
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        chunk = data[start:end]
+        if self.filename is None:
+            self.field_data += chunk
+            if len(self.field_data) > MAX_FIELD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Field '{self.name}' is too large")
+            return
+        if self.writer is None:
+            return
+        if self.writer.size + len(self.head) + len(chunk) > self.max_file_bytes:
+            raise HTTPException(status_code=413, detail=f"'{self.filename}' exceeds {self.max_file_bytes} bytes")
+        if self.ext is None:
+            self.head += chunk
+            if len(self.head) < SNIFF_BYTES:
+                return
+            self._check_head()
+            chunk, self.head = self.head, b""
+        self.writer.write(chunk)
+
+    def _check_head(self) -> None:
+        self.ext = sniff_image(self.head)
+        if self.ext is None:
+            raise HTTPException(status_code=415, detail=f"'{self.filename}' is not a JPEG, PNG or WebP image")
+
+    def on_part_end(self) -> None:
+        if self.filename is None:
+            self.form.fields.setdefault(self.name, []).append(self.field_data.decode("utf-8", "replace"))
+            return
+        if self.writer is None:
+            return
+        if self.ext is None:
+            # Part shorter than the sniff window
+            self._check_head()
+            self.writer.write(self.head)
+        self.writer.close()
+        self.form.files.setdefault(self.name, []).append(PendingFile(self.writer, self.ext, self.filename))
+        self.writer = None
+
+    def abort(self) -> None:
+        if self.writer is not None:
+            self.writer.abort()
+            self.writer = None
+
+
+_metrics_lock = threading.Lock()
+_metrics = {"requests": 0, "files": 0, "bytes": 0, "seconds": 0.0, "rejected": 0}
+
+
+def _record(files: int, size: int, seconds: float, rejected: bool) -> None:
+    with _metrics_lock:
+        _metrics["requests"] += 1
+        _metrics["files"] += files
+        _metrics["bytes"] += size
+        _metrics["seconds"] += seconds
+        _metrics["rejected"] += int(rejected)
+
+
+def upload_metrics() -> Dict[str, float]:
+    """Process-wide upload totals, including the average throughput in bytes/second."""
+    with _metrics_lock:
+        result = dict(_metrics)
+    result["bytes_per_second"] = result["bytes"] / result["seconds"] if result["seconds"] else 0.0
+    return result
+
+
+async def parse_upload_form(
+    request: Request,
+    max_file_bytes: int = UPLOAD_MAX_FILE_BYTES,
+    max_request_bytes: int = UPLOAD_MAX_REQUEST_BYTES,
+) -> UploadForm:
+    """Stream a multipart body into temp files in the blob store; returns its fields and received files."""
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=415, detail="Expected multipart/form-data")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_request_bytes:
+        raise HTTPException(status_code=413, detail=f"Request exceeds {max_request_bytes} bytes")
+
+    form = UploadForm()
+    stream = _FormStream(form, max_file_bytes)
+    parser = multipart.MultipartParser(params[b"boundary"], stream.callbacks())
+    started = time.perf_counter()
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_request_bytes:
+                raise HTTPException(status_code=413, detail=f"Request exceeds {max_request_bytes} bytes")
+            if chunk:
+                # Parsing and the file writes happen off the event loop
+                await anyio.to_thread.run_sync(parser.write, chunk)
+        parser.finalize()
+    except BaseException:
+        stream.abort()
+        form.discard()
+        _record(0, received, time.perf_counter() - started, rejected=True)
+        raise
+    elapsed = time.perf_counter() - started
+    files = [f for stored in form.files.values() for f in stored]
+    _record(len(files), received, elapsed, rejected=False)
+    logger.info(
+        "Streamed %d file(s), %d bytes in %.3fs (%.1f KiB/s)",
+        len(files),
+        received,
+        elapsed,
+        received / elapsed / 1024 if elapsed else 0.0,
+    )
+    return form
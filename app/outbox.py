@@ -0,0 +1,346 @@
+"""Transactional outbox for user notifications.
+
+Request handlers never write notifications themselves. They ``emit`` an
+``OutboxEvent`` in the same transaction as the change it describes, so the
+event exists exactly when the change commits. A dispatcher then fans the
+events out to the configured delivery channels (OUTBOX_CHANNELS) in batches,
+off the request path:
+
+- ``inapp``: a row in the notifications table shown in the panels;
+- ``file``: a JSON line appended to OUTBOX_FILE_PATH, a stand-in for mail;
+- ``smtp``: a plain-text mail to the recipient, e.g. to a local debugging
+  server (``python -m aiosmtpd -n -l localhost:1025``).
+
+Each pass first checks for a due event with a plain SELECT, so an idle
+dispatcher never takes the write lock. It then claims up to
+OUTBOX_BATCH_SIZE due events with a single UPDATE that stamps them with a
+lease token. Several dispatchers (one per worker process, or
+``python dispatch_outbox.py``) therefore never deliver the same batch twice.
+A slow batch (e.g. SMTP at its timeout) renews the lease on its remaining
+events, committing the ones already handled, once half of it has passed. A
+channel that fails is retried on its own, with exponential backoff, until
+OUTBOX_MAX_ATTEMPTS. The channels that already succeeded are remembered per
+event. Delivery is at least once: a dispatcher that dies after sending but
+before its commit leaves the batch to be sent again once the lease expires.
+
+``Dispatcher`` is the in-process asyncio task started with the app. A
+Session ``after_commit`` listener wakes it when this process commits an
+event. It then waits OUTBOX_COALESCE_SECONDS, so that a burst of commits
+becomes one batch instead of a dispatcher pass per request. Polling every
+OUTBOX_POLL_SECONDS picks up events committed by other processes and due
+retries.
+"""
+import asyncio
+import json
+import logging
+import smtplib
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Sequence
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_CHANNELS,
+    OUTBOX_COALESCE_SECONDS,
+    OUTBOX_FILE_PATH,
+    OUTBOX_LEASE_SECONDS,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_POLL_SECONDS,
+    OUTBOX_RETRY_BASE_SECONDS,
+    OUTBOX_RETRY_MAX_SECONDS,
+    OUTBOX_SMTP_FROM,
+    OUTBOX_SMTP_HOST,
+    OUTBOX_SMTP_PORT,
+    OUTBOX_SMTP_TIMEOUT,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def event_for(kind: str, user_id: int, title: str, message: str, **data) -> models.OutboxEvent:
+    """A new outbox event; add it to the session of the change it reports."""
+    return models.OutboxEvent(
+        kind=kind,
+        user_id=user_id,
+        payload=json.dumps({"title": title, "message": message, **data}),
+        status="pending",
+        next_attempt_at=datetime.utcnow(),
+    )
+
+
+def emit(db: Session, kind: str, user_id: int, title: str, message: str, **data) -> models.OutboxEvent:
+    outbox_event = event_for(kind, user_id, title, message, **data)
+    db.add(outbox_event)
+    return outbox_event
+
+
+class Channel(ABC):
+    """Delivery channel interface. ``deliver`` raises to have the event retried."""
+
+    name = ""
+    # Longest one delivery can block, which the dispatch lease has to cover
+    timeout = 0.0
+
+    @abstractmethod
+    def deliver(self, db: Session, outbox_event: models.OutboxEvent, payload: dict, recipient: Optional[str]) -> None:
+        ...
+
+
+class InAppChannel(Channel):
+    """Notification rows, committed together with the dispatcher's batch."""
+
+    name = "inapp"
+
+    def deliver(self, db, outbox_event, payload, recipient):
+        db.add(models.Notification(user_id=outbox_event.user_id, title=payload["title"], message=payload["message"]))
+
+
+class FileChannel(Channel):
+    name = "file"
+
+    def __init__(self, path: str = OUTBOX_FILE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def deliver(self, db, outbox_event, payload, recipient):
+        line = json.dumps(
+            {
+                "id": outbox_event.id,
+                "kind": outbox_event.kind,
+                "to": recipient,
+                "at": datetime.utcnow().isoformat(timespec="seconds"),
+                **payload,
+            }
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class SMTPChannel(Channel):
+    name = "smtp"
+
+    def __init__(
+        self,
+        host: str = OUTBOX_SMTP_HOST,
+        port: int = OUTBOX_SMTP_PORT,
+        sender: str = OUTBOX_SMTP_FROM,
+        timeout: float = OUTBOX_SMTP_TIMEOUT,
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def deliver(self, db, outbox_event, payload, recipient):
+        if not recipient:
+            raise ValueError(f"user {outbox_event.user_id} has no email address")
+        mail = EmailMessage()
+        mail["From"] = self.sender
+        mail["To"] = recipient
+        mail["Subject"] = payload["title"]
+        mail.set_content(payload["message"])
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(mail)
+
+
+CHANNELS = {channel.name: channel for channel in (InAppChannel, FileChannel, SMTPChannel)}
+
+
+def configured_channels() -> List[Channel]:
+    unknown = [name for name in OUTBOX_CHANNELS if name not in CHANNELS]
+    if unknown:
+        raise ValueError(f"Unknown OUTBOX_CHANNELS: {', '.join(unknown)}")
+    channels = [CHANNELS[name]() for name in OUTBOX_CHANNELS]
+    check_lease(channels)
+    return channels
+
+
+def check_lease(channels: Sequence[Channel], lease_seconds: float = OUTBOX_LEASE_SECONDS) -> None:
+    """The lease is renewed between deliveries, so it must outlast two of them."""
+    per_event = sum(channel.timeout for channel in channels)
+    if lease_seconds < 2 * per_event:
+        raise ValueError(
+            f"OUTBOX_LEASE_SECONDS ({lease_seconds:g}) must be at least twice the channel timeouts "
+            f"of one delivery ({per_event:g}s)"
+        )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_SECONDS))
+
+
+def _claim(db: Session, token: str, now: datetime, batch_size: int) -> bool:
+    table = models.OutboxEvent.__table__
+    due = select(table.c.id).where(table.c.status == "pending", table.c.next_attempt_at <= now)
+    # Idle polls stay read-only: only take the write lock when something is due
+    if db.execute(due.limit(1)).first() is None:
+        return False
+    db.execute(
+        update(table)
+        .where(table.c.id.in_(due.order_by(table.c.id).limit(batch_size).scalar_subquery()))
+        .values(claimed_by=token, next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+    )
+    db.commit()
+    return True
+
+
+def _renew_lease(db: Session, token: str) -> datetime:
+    """Commit the events handled so far and extend the lease on the rest; returns the next renewal time."""
+    table = models.OutboxEvent.__table__
+    now = datetime.utcnow()
+    db.flush()
+    db.execute(
+        update(table)
+        .where(table.c.claimed_by == token, table.c.status == "pending")
+        .values(next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+    )
+    db.commit()
+    return now + timedelta(seconds=OUTBOX_LEASE_SECONDS / 2)
+
+
+def _deliver(db: Session, outbox_event: models.OutboxEvent, channels: Sequence[Channel], recipient: Optional[str]) -> None:
+    done = set(filter(None, outbox_event.delivered_channels.split(",")))
+    payload = json.loads(outbox_event.payload)
+    errors = []
+    for channel in channels:
+        if channel.name in done:
+            continue
+        try:
+            channel.deliver(db, outbox_event, payload, recipient)
+            done.add(channel.name)
+        except Exception as exc:
+            errors.append(f"{channel.name}: {exc}")
+
+    now = datetime.utcnow()
+    outbox_event.delivered_channels = ",".join(sorted(done))
+    outbox_event.claimed_by = None
+    if not errors:
+        outbox_event.status = "delivered"
+        outbox_event.delivered_at = now
+        return
+    outbox_event.attempts += 1
+    outbox_event.last_error = "; ".join(errors)[:2000]
+    if outbox_event.attempts >= OUTBOX_MAX_ATTEMPTS:
+        outbox_event.status = "failed"
+        logger.error("Outbox event %s failed for good: %s", outbox_event.id, outbox_event.last_error)
+    else:
+        outbox_event.next_attempt_at = now + retry_delay(outbox_event.attempts)
+
+
+def dispatch_once(channels: Optional[Sequence[Channel]] = None, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Claim and deliver one batch of due events; returns how many were claimed."""
+    from app.database import SessionLocal
+
+    channels = configured_channels() if channels is None else channels
+    token = uuid.uuid4().hex
+    with SessionLocal() as db:
+        claimed_at = datetime.utcnow()
+        if not _claim(db, token, claimed_at, batch_size):
+            return 0
+        renew_at = claimed_at + timedelta(seconds=OUTBOX_LEASE_SECONDS / 2)
+        events = (
+            db.query(models.OutboxEvent)
+            .filter(models.OutboxEvent.claimed_by == token)
+            .order_by(models.OutboxEvent.id)
+            .all()
+        )
+        if not events:
+            return 0
+        recipients: Dict[int, str] = dict(
+            db.query(models.User.id, models.User.email).filter(
+                models.User.id.in_({e.user_id for e in events if e.user_id is not None})
+            )
+        )
+        for outbox_event in events:
+            if datetime.utcnow() >= renew_at:
+                renew_at = _renew_lease(db, token)
+            _deliver(db, outbox_event, channels, recipients.get(outbox_event.user_id))
+        db.commit()
+    return len(events)
+
+
+def drain(channels: Optional[Sequence[Channel]] = None, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Dispatch until no event is due; returns the number handled."""
+    channels = configured_channels() if channels is None else channels
+    total = 0
+    while True:
+        claimed = dispatch_once(channels, batch_size)
+        total += claimed
+        if claimed < batch_size:
+            return total
+
+
+class Dispatcher:
+    """Background asyncio task running ``drain`` on wake-ups and every OUTBOX_POLL_SECONDS."""
+
+    def __init__(self, poll_seconds: float = OUTBOX_POLL_SECONDS, coalesce_seconds: float = OUTBOX_COALESCE_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.coalesce_seconds = coalesce_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        channels = configured_channels()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(channels))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+    def wake(self) -> None:
+        """Thread-safe nudge after a commit that emitted events."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self, channels: Sequence[Channel]) -> None:
+        while True:
+            try:
+                await run_in_threadpool(drain, channels)
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                # Let a burst of commits pile up into one batch
+                await asyncio.sleep(self.coalesce_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+dispatcher = Dispatcher()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_emitted(session: Session, flush_context) -> None:
+    if any(isinstance(obj, models.OutboxEvent) for obj in session.new):
+        session.info["outbox_emitted"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session) -> None:
+    if session.info.pop("outbox_emitted", False):
+        dispatcher.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_emitted(session: Session) -> None:
+    session.info.pop("outbox_emitted", None)
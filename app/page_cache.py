@@ -0,0 +1,200 @@
+"""Rendered-page cache for the public catalog and building detail pages.
+
+The pages are the same for every visitor, so the rendered HTML is stored
+under the path plus the query parameters that change the output. Region and
+max_price are keyed by their parsed values, so ``?region=01`` and
+``?region=1`` share an entry. Entries expire after PAGE_CACHE_TTL_SECONDS and
+the oldest are evicted past PAGE_CACHE_SIZE.
+
+A Session ``after_flush``/``after_commit`` listener invalidates the affected
+pages whenever buildings, rooms, photos, amenities or regions are written:
+the catalog pages plus the detail page of each touched building, or
+everything for an amenity change.
+That covers the admin forms, the REST routers and the background variant
+job alike. Each invalidation also bumps a generation counter. A render that
+started before the commit is then not stored, because it may have read the
+old rows. Pages are rendered from the primary, never the read replica: a
+render from a lagging replica right after an invalidation would store the
+old data for the whole TTL, which the generation check cannot detect.
+
+``MemoryBackend`` is per process. A shared cache (e.g. Redis) only has to
+implement ``PageCacheBackend``.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Iterable, Optional, Set, Tuple
+
+from fastapi.responses import HTMLResponse
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app import catalog, models
+from app.config import PAGE_CACHE_SIZE, PAGE_CACHE_TTL_SECONDS
+
+
+CATALOG_PREFIX = "catalog:"
+BUILDING_PREFIX = "building:"
+
+
+class PageCacheBackend(ABC):
+    """Storage interface for rendered pages."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, body: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, keys: Iterable[str]) -> None:
+        ...
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class MemoryBackend(PageCacheBackend):
+    """Thread-safe in-process LRU with a per-entry expiry time."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes, ttl: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class PageCache:
+    def __init__(self, backend: PageCacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: str) -> Optional[HTMLResponse]:
+        if not self.enabled:
+            return None
+        body = self.backend.get(key)
+        if body is None:
+            return None
+        return HTMLResponse(content=body, headers={"X-Cache": "HIT"})
+
+    def put(self, key: str, response, generation: int):
+        """Store a rendered 200 response unless the data changed since ``generation`` was read."""
+        if self.enabled and response.status_code == 200:
+            with self._lock:
+                if generation == self.generation:
+                    self.backend.set(key, bytes(response.body), self.ttl)
+            response.headers["X-Cache"] = "MISS"
+        return response
+
+    def invalidate(self, building_ids: Iterable[int] = (), everything: bool = False) -> None:
+        with self._lock:
+            self.generation += 1
+            if everything:
+                self.backend.clear()
+                return
+            self.backend.delete_prefix(CATALOG_PREFIX)
+            self.backend.delete(building_key(bid) for bid in building_ids)
+
+
+cache = PageCache(MemoryBackend(PAGE_CACHE_SIZE), PAGE_CACHE_TTL_SECONDS)
+
+
+def _part(value) -> str:
+    return "" if value is None else str(value)
+
+
+def catalog_key(region: Optional[str], city: Optional[str], max_price: Optional[str], q: Optional[str]) -> str:
+    # city and q are echoed back into the form, so they are keyed verbatim
+    return CATALOG_PREFIX + "|".join(
+        [_part(catalog.parse_region(region)), city or "", _part(catalog.parse_price(max_price)), q or ""]
+    )
+
+
+def building_key(building_id: int) -> str:
+    return f"{BUILDING_PREFIX}{building_id}"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_page_writes(session: Session, flush_context) -> None:
+    building_ids: Set[int] = set()
+    catalog_changed = everything = False
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.Building):
+            building_ids.add(obj.id)
+        elif isinstance(obj, (models.Room, models.BuildingPhoto)):
+            building_ids.add(obj.building_id)
+            # A room or photo moved to another building leaves the old page stale too
+            building_ids.update(inspect(obj).attrs.building_id.history.deleted)
+        elif isinstance(obj, models.Region):
+            # Listed in the catalog's region filter
+            catalog_changed = True
+        elif isinstance(obj, models.Amenity) and obj not in session.new:
+            # A new amenity is on no page until a building links it
+            everything = True
+    building_ids.discard(None)
+    if building_ids or catalog_changed:
+        session.info.setdefault("page_cache_buildings", set()).update(building_ids)
+    if everything:
+        session.info["page_cache_everything"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_pages(session: Session) -> None:
+    building_ids = session.info.pop("page_cache_buildings", None)
+    everything = session.info.pop("page_cache_everything", False)
+    if building_ids is not None or everything:
+        cache.invalidate(building_ids or (), everything=everything)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_pages(session: Session) -> None:
+    session.info.pop("page_cache_buildings", None)
+    session.info.pop("page_cache_everything", None)
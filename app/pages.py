@@ -0,0 +1,113 @@
+"""Template contexts for the HTML pages that have both a sync handler
+(app/main.py) and an async one (app/routers/async_views.py).
+
+Handlers only execute the statements and pass the results here, so the two
+paths render the same page from the same data. Like app/catalog.py this
+module does no I/O.
+"""
+from datetime import datetime
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from app import catalog, models, workflow
+
+
+NOTIFICATIONS_SHOWN = 20
+
+
+def _page(**context) -> dict:
+    return {**context, "current_year": datetime.utcnow().year}
+
+
+def index_page(
+    regions: Iterable[models.Region],
+    buildings: Sequence[models.Building],
+    photos: Iterable[models.BuildingPhoto],
+    region: Optional[str],
+    city: Optional[str],
+    max_price: Optional[str],
+    q: Optional[str],
+) -> dict:
+    catalog.attach_first_images(list(buildings), photos)
+    return _page(
+        regions=list(regions),
+        selected_region=catalog.parse_region(region),
+        selected_city=city,
+        search_query=q,
+        selected_price=catalog.parse_price(max_price),
+        buildings=buildings,
+    )
+
+
+def building_page(
+    building: models.Building, photos: Iterable[models.BuildingPhoto], free_rooms: Iterable[models.Room]
+) -> dict:
+    images, images_360 = catalog.split_gallery(photos)
+    # Facilities (amenities)
+    facilities = []
+    try:
+        facilities = catalog.active_facilities(building)
+    except Exception:
+        pass
+    return _page(
+        building=building,
+        images=images,
+        images_360=images_360,
+        facilities=facilities,
+        # Nearby places placeholder (inject real data if available)
+        nearby_places=[],
+        available_spaces=catalog.space_rows(free_rooms),
+    )
+
+
+def resident_requests_statement(user_id: int):
+    return (
+        select(models.RentalRequest)
+        .options(joinedload(models.RentalRequest.building))
+        .where(models.RentalRequest.user_id == user_id)
+        .order_by(models.RentalRequest.created_at.desc())
+    )
+
+
+def resident_contracts_statement(user_id: int):
+    return (
+        select(models.Contract)
+        .options(joinedload(models.Contract.building))
+        .where(models.Contract.user_id == user_id)
+        .order_by(models.Contract.created_at.desc())
+    )
+
+
+def notifications_statement(user_id: int):
+    return (
+        select(models.Notification)
+        .where(models.Notification.user_id == user_id)
+        .order_by(models.Notification.created_at.desc())
+        .limit(NOTIFICATIONS_SHOWN)
+    )
+
+
+def resident_page(
+    user: models.User,
+    buildings: Iterable[models.Building],
+    requests: Iterable[models.RentalRequest],
+    contracts: Iterable[models.Contract],
+    notifications: Iterable[models.Notification],
+) -> dict:
+    return _page(
+        buildings=list(buildings),
+        requests=list(requests),
+        contracts=list(contracts),
+        notifications=list(notifications),
+        current_user=user,
+    )
+
+
+def signer_statement(email: str):
+    return select(models.Signer).where(models.Signer.email == email).limit(1)
+
+
+def signer_page(user: models.User, signer: Optional[models.Signer], rows: Sequence, filters: dict) -> dict:
+    return _page(**workflow.panel_page(rows, filters), signer=signer, current_user=user)
@@ -0,0 +1,90 @@
+import base64
+import json
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query as SAQuery
+
+from app.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+
+
+def encode_cursor(sort: str, value, last_id: int) -> str:
+    raw = json.dumps([sort, value, last_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return sort, value, int(last_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class PageParams:
+    """Common query parameters for keyset-paginated list endpoints.
+
+    ``sort`` names a column (prefix with ``-`` for descending); ``cursor`` is
+    the opaque ``next_cursor`` returned by the previous page.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+        cursor: Optional[str] = Query(None),
+        sort: Optional[str] = Query(None),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.sort = sort
+
+
+def paginate(query: SAQuery, model, params: PageParams, sortable: Dict[str, object], default_sort: str = "id") -> dict:
+    """Apply keyset pagination to ``query`` and return ``{"items", "next_cursor"}``.
+
+    Rows are ordered by the chosen column with the primary key as tie-breaker,
+    so each page is a range seek rather than an OFFSET scan.
+    """
+    sort = params.sort or default_sort
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in sortable:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{name}'")
+    column = sortable[name]
+    pk = model.id
+
+    if params.cursor:
+        cursor_sort, value, last_id = decode_cursor(params.cursor)
+        if cursor_sort != sort:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+        if column is pk:
+            query = query.filter(pk < last_id if descending else pk > last_id)
+        elif descending:
+            # SQLite orders NULLs first ascending, so they come last when descending
+            if value is None:
+                query = query.filter(and_(column.is_(None), pk < last_id))
+            else:
+                query = query.filter(
+                    or_(column < value, and_(column == value, pk < last_id), column.is_(None))
+                )
+        else:
+            if value is None:
+                query = query.filter(or_(and_(column.is_(None), pk > last_id), column.isnot(None)))
+            else:
+                query = query.filter(or_(column > value, and_(column == value, pk > last_id)))
+
+    if column is pk:
+        order = [pk.desc() if descending else pk.asc()]
+    else:
+        order = [column.desc(), pk.desc()] if descending else [column.asc(), pk.asc()]
+    rows = query.order_by(*order).limit(params.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[: params.limit]
+        last = rows[-1]
+        value = getattr(last, column.key)
+        next_cursor = encode_cursor(sort, value, last.id)
+    return {"items": rows, "next_cursor": next_cursor}
@@ -0,0 +1,167 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app import models, schemas
+from app.auth import require_superadmin
+from app.pagination import PageParams, paginate
+
+
+router = APIRouter(prefix="/admin/data", tags=["Admin Data"])
+
+
+# table name -> model, read schema, sortable columns, exact-match filters, columns searched by `q`
+TABLES = {
+    "regions": {
+        "model": models.Region,
+        "schema": schemas.RegionRead,
+        "sortable": {"id": models.Region.id, "name": models.Region.name},
+        "filters": {},
+        "search": [models.Region.name],
+    },
+    "amenities": {
+        "model": models.Amenity,
+        "schema": schemas.AmenityRead,
+        "sortable": {"id": models.Amenity.id, "name": models.Amenity.name},
+        "filters": {"is_active": models.Amenity.is_active},
+        "search": [models.Amenity.name],
+    },
+    "users": {
+        "model": models.User,
+        "schema": schemas.UserAdminRead,
+        "sortable": {"id": models.User.id, "name": models.User.name, "email": models.User.email, "role": models.User.role},
+        "filters": {"role": models.User.role, "region_id": models.User.region_id},
+        "search": [models.User.name, models.User.email],
+    },
+    "buildings": {
+        "model": models.Building,
+        "schema": schemas.BuildingRead,
+        "sortable": {
+            "id": models.Building.id,
+            "name": models.Building.name,
+            "city": models.Building.city,
+            "region_id": models.Building.region_id,
+            "floors": models.Building.floors,
+            "price_per_m2": models.Building.price_per_m2,
+        },
+        "filters": {"region_id": models.Building.region_id},
+        "search": [models.Building.name, models.Building.city, models.Building.address],
+    },
+    "rooms": {
+        "model": models.Room,
+        "schema": schemas.RoomRead,
+        "sortable": {
+            "id": models.Room.id,
+            "building_id": models.Room.building_id,
+            "floor": models.Room.floor,
+            "area": models.Room.area,
+            "status": models.Room.status,
+        },
+        "filters": {"building_id": models.Room.building_id, "status": models.Room.status},
+        "search": [models.Room.room_number],
+    },
+    "photos": {
+        "model": models.BuildingPhoto,
+        "schema": schemas.BuildingPhotoRead,
+        "sortable": {"id": models.BuildingPhoto.id, "building_id": models.BuildingPhoto.building_id},
+        "filters": {"building_id": models.BuildingPhoto.building_id, "is_360": models.BuildingPhoto.is_360},
+        "search": [models.BuildingPhoto.file_path],
+    },
+    "contracts": {
+        "model": models.Contract,
+        "schema": schemas.ContractRead,
+        "sortable": {
+            "id": models.Contract.id,
+            "building_id": models.Contract.building_id,
+            "user_id": models.Contract.user_id,
+            "total_price": models.Contract.total_price,
+            "status": models.Contract.status,
+        },
+        "filters": {
+            "building_id": models.Contract.building_id,
+            "user_id": models.Contract.user_id,
+            "status": models.Contract.status,
+        },
+        "search": [models.Contract.selected_rooms, models.Contract.zero_risk_doc],
+    },
+    "approvals": {
+        "model": models.Approval,
+        "schema": schemas.ApprovalRead,
+        "sortable": {
+            "id": models.Approval.id,
+            "contract_id": models.Approval.contract_id,
+            "signer_id": models.Approval.signer_id,
+            "status": models.Approval.status,
+        },
+        "filters": {
+            "contract_id": models.Approval.contract_id,
+            "signer_id": models.Approval.signer_id,
+            "status": models.Approval.status,
+        },
+        "search": [],
+    },
+    "signers": {
+        "model": models.Signer,
+        "schema": schemas.SignerRead,
+        "sortable": {
+            "id": models.Signer.id,
+            "name": models.Signer.name,
+            "region_id": models.Signer.region_id,
+            "signing_order": models.Signer.signing_order,
+        },
+        "filters": {
+            "region_id": models.Signer.region_id,
+            "position": models.Signer.position,
+            "status": models.Signer.status,
+        },
+        "search": [models.Signer.name, models.Signer.email, models.Signer.position],
+    },
+}
+
+DEFAULT_SORT = {"signers": "signing_order"}
+
+
+def _coerce(column, raw: str):
+    python_type = column.type.python_type
+    if python_type is bool:
+        return raw.lower() in ("1", "true", "yes", "on")
+    try:
+        return python_type(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid value for '{column.key}'")
+
+
+@router.get("/{table}", response_model=schemas.Page[dict])
+def admin_table_page(
+    table: str,
+    request: Request,
+    q: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    _: models.User = Depends(require_superadmin),
+):
+    """One page of an admin dashboard tab, with sorting and filtering done in SQL.
+
+    Any query parameter named in the table's ``filters`` is applied as an
+    exact match; ``q`` is a substring search over its text columns.
+    """
+    spec = TABLES.get(table)
+    if not spec:
+        raise HTTPException(status_code=404, detail="Unknown table")
+    model = spec["model"]
+    query = db.query(model)
+    for name, column in spec["filters"].items():
+        raw = request.query_params.get(name)
+        if raw not in (None, ""):
+            query = query.filter(column == _coerce(column, raw))
+    if q and spec["search"]:
+        query = query.filter(or_(*[column.contains(q) for column in spec["search"]]))
+    result = paginate(query, model, page, spec["sortable"], default_sort=DEFAULT_SORT.get(table, "id"))
+    schema = spec["schema"]
+    return {
+        "items": [schema.model_validate(row).model_dump(mode="json") for row in result["items"]],
+        "next_cursor": result["next_cursor"],
+    }
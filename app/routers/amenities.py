@@ -1,14 +1,20 @@
-from typing import List, Optional
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app import models, schemas
+from app.database import get_db, get_read_db
+from app import conditional, models, schemas
+from app.pagination import PageParams, paginate
 
 
 router = APIRouter(prefix="/amenities", tags=["Amenities"])
 
+SORTABLE = {
+    "id": models.Amenity.id,
+    "name": models.Amenity.name,
+}
+
 
 @router.post("/", response_model=schemas.AmenityRead, status_code=status.HTTP_201_CREATED)
 def create_amenity(amenity: schemas.AmenityCreate, db: Session = Depends(get_db)):
@@ -22,12 +28,21 @@ def create_amenity(amenity: schemas.AmenityCreate, db: Session = Depends(get_db)
     return a
 
 
-@router.get("/", response_model=List[schemas.AmenityRead])
-def list_amenities(active: Optional[bool] = Query(None), db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.Page[schemas.AmenityRead])
+def list_amenities(
+    request: Request,
+    response: Response,
+    active: Optional[bool] = Query(None),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
     q = db.query(models.Amenity)
     if active is not None:
         q = q.filter(models.Amenity.is_active == active)
-    return q.all()
+    not_modified = conditional.collection(request, response, db, models.Amenity)
+    if not_modified:
+        return not_modified
+    return paginate(q, models.Amenity, page, SORTABLE)
 
 
 @router.put("/{amenity_id}", response_model=schemas.AmenityRead)
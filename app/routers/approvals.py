@@ -1,14 +1,20 @@
-from typing import List
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app import models, schemas
+from app.pagination import PageParams, paginate
 
 
 router = APIRouter(prefix="/approvals", tags=["Approvals"])
 
+SORTABLE = {
+    "id": models.Approval.id,
+    "contract_id": models.Approval.contract_id,
+    "signer_id": models.Approval.signer_id,
+    "status": models.Approval.status,
+}
+
 
 @router.post("/", response_model=schemas.ApprovalRead, status_code=status.HTTP_201_CREATED)
 def create_approval(approval: schemas.ApprovalCreate, db: Session = Depends(get_db)):
@@ -19,13 +25,13 @@ def create_approval(approval: schemas.ApprovalCreate, db: Session = Depends(get_
     return db_approval
 
 
-@router.get("/", response_model=List[schemas.ApprovalRead])
-def list_approvals(db: Session = Depends(get_db)):
-    return db.query(models.Approval).all()
+@router.get("/", response_model=schemas.Page[schemas.ApprovalRead])
+def list_approvals(page: PageParams = Depends(), db: Session = Depends(get_read_db)):
+    return paginate(db.query(models.Approval), models.Approval, page, SORTABLE)
 
 
 @router.get("/{approval_id}", response_model=schemas.ApprovalRead)
-def get_approval(approval_id: int, db: Session = Depends(get_db)):
+def get_approval(approval_id: int, db: Session = Depends(get_read_db)):
     db_approval = db.get(models.Approval, approval_id)
     if not db_approval:
         raise HTTPException(status_code=404, detail="Approval not found")
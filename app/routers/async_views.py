@@ -0,0 +1,135 @@
+"""Async versions of the hot read paths, served over AsyncSession/aiosqlite.
+
+Registered ahead of the sync handlers in app/main.py when ASYNC_ROUTES is
+on, so they take over the same paths. Relationships used by the templates
+are eager-loaded: lazy loads cannot run on an AsyncSession.
+"""
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.templating import Jinja2Templates
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app import assets, catalog, lazy_loads, models, page_cache, pages, stats, workflow
+from app.auth import get_current_user_async, require_superadmin_async
+from app.database import get_async_db
+from app.routers import dashboard
+
+
+router = APIRouter(include_in_schema=False)
+templates = Jinja2Templates(directory="app/templates")
+assets.install(templates)
+lazy_loads.install(templates)
+
+
+@router.get("/", response_class=HTMLResponse)
+async def index(
+    request: Request,
+    region: str | None = None,
+    city: str | None = None,
+    max_price: str | None = None,
+    q: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    key = page_cache.catalog_key(region, city, max_price, q)
+    cached = page_cache.cache.get(key)
+    if cached is not None:
+        return cached
+    generation = page_cache.cache.generation
+
+    regions_list = (await db.execute(select(models.Region))).scalars().all()
+    buildings_list = (await db.execute(catalog.catalog_statement(region, city, max_price, q))).scalars().all()
+
+    building_ids = [b.id for b in buildings_list]
+    photos = (await db.execute(catalog.photos_statement(building_ids))).scalars().all() if building_ids else []
+
+    response = templates.TemplateResponse(
+        "index.html",
+        {"request": request, **pages.index_page(regions_list, buildings_list, photos, region, city, max_price, q)},
+    )
+    return page_cache.cache.put(key, response, generation)
+
+
+@router.get("/building/{building_id}", response_class=HTMLResponse)
+async def building_detail_page(building_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    key = page_cache.building_key(building_id)
+    cached = page_cache.cache.get(key)
+    if cached is not None:
+        return cached
+    generation = page_cache.cache.generation
+
+    building = await db.get(models.Building, building_id, options=[selectinload(models.Building.amenities_rel)])
+    if not building:
+        return RedirectResponse(url="/", status_code=302)
+
+    photos = (await db.execute(catalog.photos_statement([building_id]))).scalars().all()
+    spaces = (await db.execute(catalog.free_rooms_statement(building_id))).scalars().all()
+
+    response = templates.TemplateResponse(
+        "building_detail.html", {"request": request, **pages.building_page(building, photos, spaces)}
+    )
+    return page_cache.cache.put(key, response, generation)
+
+
+# The panels and dashboards read from the primary, like their sync versions:
+# they are reloaded right after the user's own writes.
+@router.get("/residentpanel", response_class=HTMLResponse)
+async def resident_panel(request: Request, db: AsyncSession = Depends(get_async_db)):
+    try:
+        current_user = await get_current_user_async(request, db)
+    except HTTPException:
+        return RedirectResponse(url="/login", status_code=302)
+
+    context = pages.resident_page(
+        current_user,
+        (await db.execute(select(models.Building))).scalars(),
+        (await db.execute(pages.resident_requests_statement(current_user.id))).scalars(),
+        (await db.execute(pages.resident_contracts_statement(current_user.id))).scalars(),
+        (await db.execute(pages.notifications_statement(current_user.id))).scalars(),
+    )
+    return templates.TemplateResponse("resident_panel.html", {"request": request, **context})
+
+
+@router.get("/signerpanel", response_class=HTMLResponse)
+async def signer_panel(
+    request: Request,
+    status: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    before: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        current_user = await get_current_user_async(request, db)
+    except HTTPException:
+        return RedirectResponse(url="/login", status_code=302)
+    signer = (await db.execute(pages.signer_statement(current_user.email))).scalars().first()
+    filters = workflow.panel_filters(status, date_from, date_to, before)
+    rows = (await db.execute(workflow.panel_statement(signer.id, filters))).all() if signer else []
+    return templates.TemplateResponse(
+        "signer_panel.html", {"request": request, **pages.signer_page(current_user, signer, rows, filters)}
+    )
+
+
+@router.get("/dashboard/summary")
+async def dashboard_summary(
+    db: AsyncSession = Depends(get_async_db), _: models.User = Depends(require_superadmin_async)
+) -> Dict[str, Any]:
+    return dashboard.summary_payload(stats.totals_from_rows(await db.execute(stats.totals_statement())))
+
+
+@router.get("/dashboard/regions")
+async def dashboard_regions(
+    db: AsyncSession = Depends(get_async_db), _: models.User = Depends(require_superadmin_async)
+) -> List[Dict[str, Any]]:
+    return dashboard.region_rows(await db.execute(dashboard.regions_statement()))
+
+
+@router.get("/dashboard/buildings")
+async def dashboard_buildings(
+    db: AsyncSession = Depends(get_async_db), _: models.User = Depends(require_superadmin_async)
+) -> List[Dict[str, Any]]:
+    return dashboard.building_rows(await db.execute(dashboard.buildings_statement()))
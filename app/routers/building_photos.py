@@ -1,14 +1,18 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app import models, schemas
+from app.database import get_db, get_read_db
+from app import conditional, images, models, schemas
+from app.pagination import PageParams, paginate
 
 
 router = APIRouter(prefix="/building-photos", tags=["Building Photos"])
 
+SORTABLE = {
+    "id": models.BuildingPhoto.id,
+    "building_id": models.BuildingPhoto.building_id,
+}
+
 
 @router.post("/", response_model=schemas.BuildingPhotoRead, status_code=status.HTTP_201_CREATED)
 def create_building_photo(photo: schemas.BuildingPhotoCreate, db: Session = Depends(get_db)):
@@ -16,20 +20,30 @@ def create_building_photo(photo: schemas.BuildingPhotoCreate, db: Session = Depe
     db.add(db_photo)
     db.commit()
     db.refresh(db_photo)
+    images.schedule_variants(db_photo)
     return db_photo
 
 
-@router.get("/", response_model=List[schemas.BuildingPhotoRead])
-def list_building_photos(db: Session = Depends(get_db)):
-    return db.query(models.BuildingPhoto).all()
+@router.get("/", response_model=schemas.Page[schemas.BuildingPhotoRead])
+def list_building_photos(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    query = db.query(models.BuildingPhoto)
+    not_modified = conditional.collection(request, response, db, models.BuildingPhoto)
+    if not_modified:
+        return not_modified
+    return paginate(query, models.BuildingPhoto, page, SORTABLE)
 
 
 @router.get("/{photo_id}", response_model=schemas.BuildingPhotoRead)
-def get_building_photo(photo_id: int, db: Session = Depends(get_db)):
+def get_building_photo(photo_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
     db_photo = db.get(models.BuildingPhoto, photo_id)
     if not db_photo:
         raise HTTPException(status_code=404, detail="Building photo not found")
-    return db_photo
+    return conditional.item(request, response, db_photo) or db_photo
 
 
 @router.put("/{photo_id}", response_model=schemas.BuildingPhotoRead)
@@ -1,14 +1,21 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app import models, schemas
+from app.database import get_db, get_read_db
+from app import conditional, models, schemas
+from app.pagination import PageParams, paginate
 
 
 router = APIRouter(prefix="/buildings", tags=["Buildings"])
 
+SORTABLE = {
+    "id": models.Building.id,
+    "name": models.Building.name,
+    "city": models.Building.city,
+    "price_per_m2": models.Building.price_per_m2,
+    "total_area": models.Building.total_area,
+}
+
 
 @router.post("/", response_model=schemas.BuildingRead, status_code=status.HTTP_201_CREATED)
 def create_building(building: schemas.BuildingCreate, db: Session = Depends(get_db)):
@@ -19,17 +26,26 @@ def create_building(building: schemas.BuildingCreate, db: Session = Depends(get_
     return db_building
 
 
-@router.get("/", response_model=List[schemas.BuildingRead])
-def list_buildings(db: Session = Depends(get_db)):
-    return db.query(models.Building).all()
+@router.get("/", response_model=schemas.Page[schemas.BuildingRead])
+def list_buildings(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    query = db.query(models.Building)
+    not_modified = conditional.collection(request, response, db, models.Building)
+    if not_modified:
+        return not_modified
+    return paginate(query, models.Building, page, SORTABLE)
 
 
 @router.get("/{building_id}", response_model=schemas.BuildingRead)
-def get_building(building_id: int, db: Session = Depends(get_db)):
+def get_building(building_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
     db_building = db.get(models.Building, building_id)
     if not db_building:
         raise HTTPException(status_code=404, detail="Building not found")
-    return db_building
+    return conditional.item(request, response, db_building) or db_building
 
 
 @router.put("/{building_id}", response_model=schemas.BuildingRead)
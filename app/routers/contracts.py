@@ -1,14 +1,21 @@
-from typing import List
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app import models, schemas
+from app.pagination import PageParams, paginate
 
 
 router = APIRouter(prefix="/contracts", tags=["Contracts"])
 
+SORTABLE = {
+    "id": models.Contract.id,
+    "building_id": models.Contract.building_id,
+    "user_id": models.Contract.user_id,
+    "total_price": models.Contract.total_price,
+    "status": models.Contract.status,
+}
+
 
 @router.post("/", response_model=schemas.ContractRead, status_code=status.HTTP_201_CREATED)
 def create_contract(contract: schemas.ContractCreate, db: Session = Depends(get_db)):
@@ -19,13 +26,13 @@ def create_contract(contract: schemas.ContractCreate, db: Session = Depends(get_
     return db_contract
 
 
-@router.get("/", response_model=List[schemas.ContractRead])
-def list_contracts(db: Session = Depends(get_db)):
-    return db.query(models.Contract).all()
+@router.get("/", response_model=schemas.Page[schemas.ContractRead])
+def list_contracts(page: PageParams = Depends(), db: Session = Depends(get_read_db)):
+    return paginate(db.query(models.Contract), models.Contract, page, SORTABLE)
 
 
 @router.get("/{contract_id}", response_model=schemas.ContractRead)
-def get_contract(contract_id: int, db: Session = Depends(get_db)):
+def get_contract(contract_id: int, db: Session = Depends(get_read_db)):
     db_contract = db.get(models.Contract, contract_id)
     if not db_contract:
         raise HTTPException(status_code=404, detail="Contract not found")
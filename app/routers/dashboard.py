@@ -1,53 +1,30 @@
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends
-from sqlalchemy import func
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app import models
+from app import models, stats
 from app.auth import require_superadmin
 
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
-@router.get("/summary")
-def dashboard_summary(db: Session = Depends(get_db), _: models.User = Depends(require_superadmin)) -> Dict[str, Any]:
-    total_users = db.query(models.User).count()
-    users_by_role_rows = (
-        db.query(models.User.role, func.count(models.User.id)).group_by(models.User.role).all()
-    )
-    users_by_role = {role or "unknown": count for role, count in users_by_role_rows}
-
-    total_regions = db.query(models.Region).count()
-    total_buildings = db.query(models.Building).count()
-    total_rooms = db.query(models.Room).count()
-    rooms_by_status_rows = (
-        db.query(models.Room.status, func.count(models.Room.id))
-        .group_by(models.Room.status)
-        .all()
-    )
-    rooms_by_status = {status or "unknown": count for status, count in rooms_by_status_rows}
-
-    total_contracts = db.query(models.Contract).count()
-    contracts_by_status_rows = (
-        db.query(models.Contract.status, func.count(models.Contract.id))
-        .group_by(models.Contract.status)
-        .all()
-    )
-    contracts_by_status = {status or "unknown": count for status, count in contracts_by_status_rows}
-
-    total_approvals = db.query(models.Approval).count()
+def summary_payload(counters: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    users_by_role = counters.get("users", {})
+    rooms_by_status = counters.get("rooms", {})
+    contracts_by_status = counters.get("contracts", {})
 
     return {
         "totals": {
-            "users": total_users,
-            "regions": total_regions,
-            "buildings": total_buildings,
-            "rooms": total_rooms,
-            "contracts": total_contracts,
-            "approvals": total_approvals,
+            "users": sum(users_by_role.values()),
+            "regions": sum(counters.get("regions", {}).values()),
+            "buildings": sum(counters.get("buildings", {}).values()),
+            "rooms": sum(rooms_by_status.values()),
+            "contracts": sum(contracts_by_status.values()),
+            "approvals": sum(counters.get("approvals", {}).values()),
         },
         "users_by_role": users_by_role,
         "rooms_by_status": rooms_by_status,
@@ -55,84 +32,119 @@ def dashboard_summary(db: Session = Depends(get_db), _: models.User = Depends(re
     }
 
 
-@router.get("/regions")
-def dashboard_regions(db: Session = Depends(get_db), _: models.User = Depends(require_superadmin)) -> List[Dict[str, Any]]:
-    regions = db.query(models.Region).all()
-    result: List[Dict[str, Any]] = []
-    for region in regions:
-        buildings_count = db.query(models.Building).filter(models.Building.region_id == region.id).count()
-        rooms_count = (
-            db.query(models.Room)
-            .join(models.Building, models.Room.building_id == models.Building.id)
-            .filter(models.Building.region_id == region.id)
-            .count()
-        )
-        free_rooms = (
-            db.query(models.Room)
-            .join(models.Building, models.Room.building_id == models.Building.id)
-            .filter(models.Building.region_id == region.id, models.Room.status == "free")
-            .count()
-        )
-        booked_rooms = (
-            db.query(models.Room)
-            .join(models.Building, models.Room.building_id == models.Building.id)
-            .filter(models.Building.region_id == region.id, models.Room.status == "booked")
-            .count()
-        )
-        contracts_count = (
-            db.query(models.Contract)
-            .join(models.Building, models.Contract.building_id == models.Building.id)
-            .filter(models.Building.region_id == region.id)
-            .count()
-        )
-        result.append(
-            {
-                "region_id": region.id,
-                "region_name": region.name,
-                "buildings_count": buildings_count,
-                "rooms_count": rooms_count,
-                "free_rooms": free_rooms,
-                "booked_rooms": booked_rooms,
-                "contracts_count": contracts_count,
-            }
+@router.get("/summary")
+def dashboard_summary(db: Session = Depends(get_db), _: models.User = Depends(require_superadmin)) -> Dict[str, Any]:
+    # Served from the incrementally maintained stat_counters table (see app.stats)
+    return summary_payload(stats.totals(db))
+
+
+def _room_counts_by_building():
+    """Rooms per building with free/booked split, aggregated in a single grouped pass."""
+    return (
+        select(
+            models.Room.building_id.label("building_id"),
+            func.count(models.Room.id).label("rooms_count"),
+            func.sum(case((models.Room.status == "free", 1), else_=0)).label("free_rooms"),
+            func.sum(case((models.Room.status == "booked", 1), else_=0)).label("booked_rooms"),
         )
-    return result
+        .group_by(models.Room.building_id)
+        .subquery()
+    )
 
 
-@router.get("/buildings")
-def dashboard_buildings(db: Session = Depends(get_db), _: models.User = Depends(require_superadmin)) -> List[Dict[str, Any]]:
-    buildings = db.query(models.Building).all()
-    result: List[Dict[str, Any]] = []
-    for building in buildings:
-        rooms_count = db.query(models.Room).filter(models.Room.building_id == building.id).count()
-        free_rooms = (
-            db.query(models.Room)
-            .filter(models.Room.building_id == building.id, models.Room.status == "free")
-            .count()
-        )
-        booked_rooms = (
-            db.query(models.Room)
-            .filter(models.Room.building_id == building.id, models.Room.status == "booked")
-            .count()
+def _count_by_building(column):
+    return (
+        select(column.label("building_id"), func.count().label("cnt"))
+        .group_by(column)
+        .subquery()
+    )
+
+
+def regions_statement():
+    rooms = _room_counts_by_building()
+    contracts = _count_by_building(models.Contract.building_id)
+    return (
+        select(
+            models.Region.id,
+            models.Region.name,
+            func.count(models.Building.id),
+            func.coalesce(func.sum(rooms.c.rooms_count), 0),
+            func.coalesce(func.sum(rooms.c.free_rooms), 0),
+            func.coalesce(func.sum(rooms.c.booked_rooms), 0),
+            func.coalesce(func.sum(contracts.c.cnt), 0),
         )
-        contracts_count = db.query(models.Contract).filter(models.Contract.building_id == building.id).count()
-        photos_count = db.query(models.BuildingPhoto).filter(models.BuildingPhoto.building_id == building.id).count()
-
-        result.append(
-            {
-                "building_id": building.id,
-                "building_name": building.name,
-                "city": building.city,
-                "region_id": building.region_id,
-                "rooms_count": rooms_count,
-                "free_rooms": free_rooms,
-                "booked_rooms": booked_rooms,
-                "contracts_count": contracts_count,
-                "photos_count": photos_count,
-                "price_per_m2": building.price_per_m2,
-                "total_area": building.total_area,
-            }
+        .outerjoin(models.Building, models.Building.region_id == models.Region.id)
+        .outerjoin(rooms, rooms.c.building_id == models.Building.id)
+        .outerjoin(contracts, contracts.c.building_id == models.Building.id)
+        .group_by(models.Region.id, models.Region.name)
+        .order_by(models.Region.id)
+    )
+
+
+def region_rows(rows) -> List[Dict[str, Any]]:
+    return [
+        {
+            "region_id": region_id,
+            "region_name": region_name,
+            "buildings_count": buildings_count,
+            "rooms_count": rooms_count,
+            "free_rooms": free_rooms,
+            "booked_rooms": booked_rooms,
+            "contracts_count": contracts_count,
+        }
+        for region_id, region_name, buildings_count, rooms_count, free_rooms, booked_rooms, contracts_count in rows
+    ]
+
+
+@router.get("/regions")
+def dashboard_regions(db: Session = Depends(get_db), _: models.User = Depends(require_superadmin)) -> List[Dict[str, Any]]:
+    return region_rows(db.execute(regions_statement()))
+
+
+def buildings_statement():
+    rooms = _room_counts_by_building()
+    contracts = _count_by_building(models.Contract.building_id)
+    photos = _count_by_building(models.BuildingPhoto.building_id)
+    return (
+        select(
+            models.Building.id,
+            models.Building.name,
+            models.Building.city,
+            models.Building.region_id,
+            func.coalesce(rooms.c.rooms_count, 0),
+            func.coalesce(rooms.c.free_rooms, 0),
+            func.coalesce(rooms.c.booked_rooms, 0),
+            func.coalesce(contracts.c.cnt, 0),
+            func.coalesce(photos.c.cnt, 0),
+            models.Building.price_per_m2,
+            models.Building.total_area,
         )
-    return result
+        .outerjoin(rooms, rooms.c.building_id == models.Building.id)
+        .outerjoin(contracts, contracts.c.building_id == models.Building.id)
+        .outerjoin(photos, photos.c.building_id == models.Building.id)
+        .order_by(models.Building.id)
+    )
 
 
+def building_rows(rows) -> List[Dict[str, Any]]:
+    return [
+        {
+            "building_id": row[0],
+            "building_name": row[1],
+            "city": row[2],
+            "region_id": row[3],
+            "rooms_count": row[4],
+            "free_rooms": row[5],
+            "booked_rooms": row[6],
+            "contracts_count": row[7],
+            "photos_count": row[8],
+            "price_per_m2": row[9],
+            "total_area": row[10],
+        }
+        for row in rows
+    ]
+
+
+@router.get("/buildings")
+def dashboard_buildings(db: Session = Depends(get_db), _: models.User = Depends(require_superadmin)) -> List[Dict[str, Any]]:
+    return building_rows(db.execute(buildings_statement()))
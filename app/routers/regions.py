@@ -1,14 +1,18 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app import models, schemas
+from app.database import get_db, get_read_db
+from app import conditional, models, schemas
+from app.pagination import PageParams, paginate
 
 
 router = APIRouter(prefix="/regions", tags=["Regions"])
 
+SORTABLE = {
+    "id": models.Region.id,
+    "name": models.Region.name,
+}
+
 
 @router.post("/", response_model=schemas.RegionRead, status_code=status.HTTP_201_CREATED)
 def create_region(region: schemas.RegionCreate, db: Session = Depends(get_db)):
@@ -19,17 +23,26 @@ def create_region(region: schemas.RegionCreate, db: Session = Depends(get_db)):
     return db_region
 
 
-@router.get("/", response_model=List[schemas.RegionRead])
-def list_regions(db: Session = Depends(get_db)):
-    return db.query(models.Region).all()
+@router.get("/", response_model=schemas.Page[schemas.RegionRead])
+def list_regions(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    query = db.query(models.Region)
+    not_modified = conditional.collection(request, response, db, models.Region)
+    if not_modified:
+        return not_modified
+    return paginate(query, models.Region, page, SORTABLE)
 
 
 @router.get("/{region_id}", response_model=schemas.RegionRead)
-def get_region(region_id: int, db: Session = Depends(get_db)):
+def get_region(region_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
     db_region = db.get(models.Region, region_id)
     if not db_region:
         raise HTTPException(status_code=404, detail="Region not found")
-    return db_region
+    return conditional.item(request, response, db_region) or db_region
 
 
 @router.put("/{region_id}", response_model=schemas.RegionRead)
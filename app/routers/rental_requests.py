@@ -0,0 +1,21 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user
+from app.database import get_db
+from app import models, schemas, workflow
+
+
+router = APIRouter(prefix="/rental-requests", tags=["Rental Requests"])
+
+
+@router.post("/batch", response_model=List[schemas.RentalRequestRead], status_code=status.HTTP_201_CREATED)
+def create_rental_requests_batch(
+    payload: schemas.RentalRequestBatch,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Submit up to 100 rental requests at once; all are created or none (e.g. an unknown building gives 404)."""
+    return workflow.submit_requests(db, current_user, payload.requests)
@@ -0,0 +1,29 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user
+from app.database import get_db
+from app import models, schemas, workflow
+
+
+router = APIRouter(prefix="/request-approvals", tags=["Request Approvals"])
+
+
+@router.post("/bulk", response_model=List[schemas.RequestApprovalBulkItem])
+def decide_request_approvals(
+    payload: schemas.RequestApprovalBulk,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Approve or decline up to 500 approvals in one transaction, with a result per approval id."""
+    if payload.action == "decline" and not payload.reason:
+        raise HTTPException(status_code=422, detail="A reason is required to decline")
+    try:
+        results = workflow.decide_many(db, current_user, payload.ids, payload.action, payload.reason)
+    except HTTPException:
+        db.rollback()
+        raise
+    db.commit()
+    return results
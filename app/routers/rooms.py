@@ -1,14 +1,21 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app import models, schemas
+from app.database import get_db, get_read_db
+from app import conditional, models, schemas
+from app.pagination import PageParams, paginate
 
 
 router = APIRouter(prefix="/rooms", tags=["Rooms"])
 
+SORTABLE = {
+    "id": models.Room.id,
+    "building_id": models.Room.building_id,
+    "floor": models.Room.floor,
+    "area": models.Room.area,
+    "status": models.Room.status,
+}
+
 
 @router.post("/", response_model=schemas.RoomRead, status_code=status.HTTP_201_CREATED)
 def create_room(room: schemas.RoomCreate, db: Session = Depends(get_db)):
@@ -19,17 +26,26 @@ def create_room(room: schemas.RoomCreate, db: Session = Depends(get_db)):
     return db_room
 
 
-@router.get("/", response_model=List[schemas.RoomRead])
-def list_rooms(db: Session = Depends(get_db)):
-    return db.query(models.Room).all()
+@router.get("/", response_model=schemas.Page[schemas.RoomRead])
+def list_rooms(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    query = db.query(models.Room)
+    not_modified = conditional.collection(request, response, db, models.Room)
+    if not_modified:
+        return not_modified
+    return paginate(query, models.Room, page, SORTABLE)
 
 
 @router.get("/{room_id}", response_model=schemas.RoomRead)
-def get_room(room_id: int, db: Session = Depends(get_db)):
+def get_room(room_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
     db_room = db.get(models.Room, room_id)
     if not db_room:
         raise HTTPException(status_code=404, detail="Room not found")
-    return db_room
+    return conditional.item(request, response, db_room) or db_room
 
 
 @router.put("/{room_id}", response_model=schemas.RoomRead)
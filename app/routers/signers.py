@@ -1,27 +1,41 @@
-from typing import List, Optional
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app import models, schemas
+from app.database import get_db, get_read_db
+from app import conditional, models, schemas
+from app.pagination import PageParams, paginate
 
 
 router = APIRouter(prefix="/signers", tags=["Signers"])
 
+SORTABLE = {
+    "id": models.Signer.id,
+    "name": models.Signer.name,
+    "region_id": models.Signer.region_id,
+    "signing_order": models.Signer.signing_order,
+}
 
-@router.get("/", response_model=List[schemas.SignerRead])
+
+@router.get("/", response_model=schemas.Page[schemas.SignerRead])
 def list_signers(
+    request: Request,
+    response: Response,
     region_id: Optional[int] = Query(None),
     position: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
 ):
     q = db.query(models.Signer)
     if region_id is not None:
         q = q.filter(models.Signer.region_id == region_id)
     if position:
         q = q.filter(models.Signer.position == position)
-    return q.order_by(models.Signer.signing_order.asc()).all()
+    not_modified = conditional.collection(request, response, db, models.Signer)
+    if not_modified:
+        return not_modified
+    return paginate(q, models.Signer, page, SORTABLE, default_sort="signing_order")
 
 
 @router.post("/", response_model=schemas.SignerRead, status_code=status.HTTP_201_CREATED)
@@ -1,15 +1,21 @@
-from typing import List
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app import models, schemas
-from app.utils import hash_password
+from app.pagination import PageParams, paginate
+from app.utils import DEFAULT_PASSWORD, pooled_hash_password
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+SORTABLE = {
+    "id": models.User.id,
+    "name": models.User.name,
+    "email": models.User.email,
+    "role": models.User.role,
+}
+
 
 @router.post("/", response_model=schemas.UserRead, status_code=status.HTTP_201_CREATED)
 def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
@@ -18,7 +24,8 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
     data = user.model_dump()
     if data.get("password_hash"):
-        data["password_hash"] = hash_password(data["password_hash"])
+        data["must_change_password"] = data["password_hash"] == DEFAULT_PASSWORD
+        data["password_hash"] = pooled_hash_password(data["password_hash"])
     db_user = models.User(**data)
     db.add(db_user)
     db.commit()
@@ -26,13 +33,13 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 
-@router.get("/", response_model=List[schemas.UserRead])
-def list_users(db: Session = Depends(get_db)):
-    return db.query(models.User).all()
+@router.get("/", response_model=schemas.Page[schemas.UserRead])
+def list_users(page: PageParams = Depends(), db: Session = Depends(get_read_db)):
+    return paginate(db.query(models.User), models.User, page, SORTABLE)
 
 
 @router.get("/{user_id}", response_model=schemas.UserRead)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_read_db)):
     db_user = db.get(models.User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -53,6 +60,9 @@ def update_user(user_id: int, user_update: schemas.UserUpdate, db: Session = Dep
         )
         if existing:
             raise HTTPException(status_code=400, detail="Email already registered")
+    if update_data.get("password_hash"):
+        update_data["must_change_password"] = update_data["password_hash"] == DEFAULT_PASSWORD
+        update_data["password_hash"] = pooled_hash_password(update_data["password_hash"])
     for key, value in update_data.items():
         setattr(db_user, key, value)
     db.commit()
@@ -1,13 +1,21 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Generic, Literal, Optional, List, TypeVar
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ORMBase(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
 # Users
 class UserBase(ORMBase):
     name: str
@@ -33,6 +41,14 @@ class UserRead(UserBase):
     id: int
 
 
+class UserAdminRead(ORMBase):
+    id: int
+    name: Optional[str] = None
+    email: str
+    role: Optional[str] = None
+    region_id: Optional[int] = None
+
+
 # Regions
 class RegionBase(ORMBase):
     name: str
@@ -258,6 +274,17 @@ class RentalRequestRead(RentalRequestBase):
     created_at: Optional[datetime] = None
 
 
+class RentalRequestSubmit(ORMBase):
+    """A rental request submitted by the current user."""
+    building_id: int
+    selected_spaces: str  # JSON of selected floors/rooms
+    total_price: float
+
+
+class RentalRequestBatch(ORMBase):
+    requests: List[RentalRequestSubmit] = Field(..., min_length=1, max_length=100)
+
+
 class RequestApprovalBase(ORMBase):
     request_id: int
     signer_id: int
@@ -271,9 +298,25 @@ class RequestApprovalCreate(RequestApprovalBase):
 
 class RequestApprovalRead(RequestApprovalBase):
     id: int
+    step: Optional[int] = None
     action_at: Optional[datetime] = None
 
 
+class RequestApprovalBulk(ORMBase):
+    """Approve or decline several of the current signer's approvals in one transaction."""
+    action: Literal["approve", "decline"]
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+    reason: Optional[str] = None  # required to decline; kept as the comment when approving
+
+
+class RequestApprovalBulkItem(ORMBase):
+    id: int
+    request_id: Optional[int] = None
+    status: Optional[str] = None  # approval status after the call; None if refused
+    request_status: Optional[str] = None
+    error: Optional[str] = None  # not_found / not_your_approval / not_actionable
+
+
 class NotificationBase(ORMBase):
     user_id: int
     title: str
@@ -0,0 +1,135 @@
+"""Full-text search over the public building catalog.
+
+Buildings are indexed in an SQLite FTS5 table (``buildings_fts``, rowid =
+building id) over name, address, city and active amenity names. A Session
+``after_flush`` listener re-indexes touched buildings on the flush
+connection, so the index commits with the data. When FTS5 is unavailable
+(or the database is not SQLite) searches fall back to LIKE filters.
+"""
+import re
+from typing import Iterable, Optional, Set, Union
+
+from sqlalchemy import Select, column, event, or_, select, table, text
+from sqlalchemy.orm import Query, Session
+
+from app import models
+
+
+fts = table("buildings_fts", column("rowid"), column("rank"))
+
+_available = False
+
+_REINDEX_SQL = text(
+    """
+    INSERT INTO buildings_fts(rowid, name, address, city, amenities)
+    SELECT b.id, coalesce(b.name, ''), coalesce(b.address, ''), coalesce(b.city, ''),
+           coalesce((SELECT group_concat(a.name, ' ')
+                     FROM building_amenities ba JOIN amenities a ON a.id = ba.amenity_id
+                     WHERE ba.building_id = b.id AND coalesce(a.is_active, 1)), '')
+    FROM buildings b
+    """
+)
+
+
+def ensure_search_index(engine) -> None:
+    """Create the FTS5 table if needed and (re)build it when it is out of sync."""
+    global _available
+    if engine.dialect.name != "sqlite":
+        return
+    try:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS buildings_fts USING fts5("
+                "name, address, city, amenities, tokenize='unicode61 remove_diacritics 2')"
+            )
+            indexed = conn.exec_driver_sql("SELECT count(*) FROM buildings_fts").scalar()
+            total = conn.exec_driver_sql("SELECT count(*) FROM buildings").scalar()
+            if indexed != total:
+                conn.exec_driver_sql("DELETE FROM buildings_fts")
+                conn.execute(_REINDEX_SQL)
+        _available = True
+    except Exception:
+        # FTS5 not compiled in; catalog search uses LIKE instead
+        _available = False
+
+
+def rebuild(db: Session) -> None:
+    """Re-index every building (drift repair after bulk edits)."""
+    if not _available:
+        return
+    db.execute(text("DELETE FROM buildings_fts"))
+    db.execute(_REINDEX_SQL)
+    db.commit()
+
+
+def _reindex(conn, building_ids: Set[int]) -> None:
+    if not building_ids:
+        return
+    ids = sorted(building_ids)
+    params = {f"id{i}": bid for i, bid in enumerate(ids)}
+    placeholders = ", ".join(f":id{i}" for i in range(len(ids)))
+    conn.execute(text(f"DELETE FROM buildings_fts WHERE rowid IN ({placeholders})"), params)
+    conn.execute(text(_REINDEX_SQL.text + f" WHERE b.id IN ({placeholders})"), params)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_search_index(session: Session, flush_context) -> None:
+    if not _available:
+        return
+    touched: Set[int] = set()
+    amenity_ids: Set[int] = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.Building) and obj.id is not None:
+            touched.add(obj.id)
+        elif isinstance(obj, models.Amenity) and obj.id is not None and obj not in session.new:
+            amenity_ids.add(obj.id)
+    conn = session.connection()
+    if amenity_ids:
+        rows = conn.execute(
+            select(models.building_amenities.c.building_id).where(
+                models.building_amenities.c.amenity_id.in_(amenity_ids)
+            )
+        )
+        touched.update(r[0] for r in rows)
+    # Deleted buildings have no source row, so the reindex only removes them
+    _reindex(conn, touched)
+
+
+def match_expression(terms: Optional[str], city: Optional[str] = None) -> Optional[str]:
+    """Build an FTS5 MATCH string: every word must match as a prefix."""
+    parts = []
+    for word in _words(terms):
+        parts.append(f'"{word}"*')
+    city_words = list(_words(city))
+    if city_words:
+        parts.append("city : (" + " ".join(f'"{w}"*' for w in city_words) + ")")
+    return " AND ".join(parts) or None
+
+
+def _words(value: Optional[str]) -> Iterable[str]:
+    return [w for w in re.split(r"[^\w]+", value or "", flags=re.UNICODE) if w]
+
+
+def apply_search(query: Union[Query, Select], terms: Optional[str], city: Optional[str] = None):
+    """Restrict a Building query (or ``select()``) to search hits, best-ranked first."""
+    match = match_expression(terms, city)
+    if not match:
+        return query
+    if _available:
+        hits = (
+            select(fts.c.rowid.label("building_id"), fts.c.rank.label("rank"))
+            .where(text("buildings_fts MATCH :match").bindparams(match=match))
+            .subquery()
+        )
+        return query.join(hits, hits.c.building_id == models.Building.id).order_by(hits.c.rank)
+    for word in _words(terms):
+        query = query.filter(
+            or_(
+                models.Building.name.contains(word),
+                models.Building.address.contains(word),
+                models.Building.city.contains(word),
+            )
+        )
+    if city:
+        query = query.filter(models.Building.city.contains(city))
+    return query
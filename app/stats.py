@@ -0,0 +1,138 @@
+"""Incrementally maintained dashboard counters.
+
+Row counts for users (by role), regions, buildings, rooms and contracts (by
+status) and approvals are kept in the ``stat_counters`` table. A Session
+``after_flush`` listener applies +1/-1 deltas on the same connection as the
+flush, so counters commit or roll back with the data they describe. Bulk
+``query.update()``/``delete()`` calls bypass the ORM unit of work; run
+``python rebuild_stats.py`` to repair any drift.
+
+Counts are global: the dashboard reads nothing finer, and a per-region
+split would have to follow buildings changing region, or being deleted,
+after their rooms and contracts were counted.
+"""
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+Key = Tuple[str, str]
+
+# model -> (metric name, attribute that splits the count, if any)
+TRACKED = {
+    models.User: ("users", "role"),
+    models.Region: ("regions", None),
+    models.Building: ("buildings", None),
+    models.Room: ("rooms", "status"),
+    models.Contract: ("contracts", "status"),
+    models.Approval: ("approvals", None),
+}
+
+
+def _noop_set(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the previous value on assignment even when the attribute is expired
+# (e.g. after a commit), so the old counter key can be decremented.
+for _model, (_metric, _attr) in TRACKED.items():
+    if _attr:
+        event.listen(getattr(_model, _attr), "set", _noop_set, retval=True, active_history=True)
+
+
+def _key(metric: str, attr: Optional[str], value) -> Key:
+    return (metric, (value or "unknown") if attr else "")
+
+
+def _value(obj, attr: Optional[str], old: bool):
+    if attr is None:
+        return None
+    if old:
+        hist = inspect(obj).attrs[attr].history
+        if hist.deleted:
+            return hist.deleted[0]
+    return getattr(obj, attr)
+
+
+def _apply(conn, deltas: Dict[Key, int]) -> None:
+    table = models.StatCounter.__table__
+    for (metric, status), delta in deltas.items():
+        if not delta:
+            continue
+        match = (table.c.metric == metric) & (table.c.status == status)
+        result = conn.execute(table.update().where(match).values(value=table.c.value + delta))
+        if result.rowcount == 0:
+            conn.execute(table.insert().values(metric=metric, status=status, value=delta))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_counters(session: Session, flush_context) -> None:
+    deltas: Dict[Key, int] = defaultdict(int)
+    for obj in session.new:
+        spec = TRACKED.get(type(obj))
+        if spec:
+            metric, attr = spec
+            deltas[_key(metric, attr, _value(obj, attr, old=False))] += 1
+    for obj in session.deleted:
+        spec = TRACKED.get(type(obj))
+        if spec:
+            metric, attr = spec
+            deltas[_key(metric, attr, _value(obj, attr, old=True))] -= 1
+    for obj in session.dirty:
+        spec = TRACKED.get(type(obj))
+        if not spec or not spec[1]:
+            continue
+        metric, attr = spec
+        if not inspect(obj).attrs[attr].history.has_changes():
+            continue
+        deltas[_key(metric, attr, _value(obj, attr, old=True))] -= 1
+        deltas[_key(metric, attr, _value(obj, attr, old=False))] += 1
+    if any(deltas.values()):
+        _apply(session.connection(), deltas)
+
+
+def rebuild(db: Session) -> None:
+    """Recompute every counter from the base tables (drift repair)."""
+    counts: Dict[Key, int] = defaultdict(int)
+    for model, (metric, attr) in TRACKED.items():
+        if attr is None:
+            counts[_key(metric, None, None)] += db.query(func.count(model.id)).scalar() or 0
+            continue
+        column = getattr(model, attr)
+        for value, n in db.query(column, func.count(model.id)).group_by(column):
+            counts[_key(metric, attr, value)] += n
+
+    db.query(models.StatCounter).delete(synchronize_session=False)
+    db.add_all(
+        models.StatCounter(metric=m, status=s, value=v)
+        for (m, s), v in counts.items()
+        if v
+    )
+    db.commit()
+
+
+def ensure_initialized(db: Session) -> None:
+    """Populate counters for databases created before the stats table existed."""
+    if db.query(models.StatCounter).first() is None:
+        rebuild(db)
+
+
+def totals_statement():
+    return select(models.StatCounter.metric, models.StatCounter.status, models.StatCounter.value)
+
+
+def totals_from_rows(rows) -> Dict[str, Dict[str, int]]:
+    result: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for metric, status, value in rows:
+        if value:
+            result[metric][status] = value
+    return result
+
+
+def totals(db: Session) -> Dict[str, Dict[str, int]]:
+    """Global counters as ``{metric: {status: value}}``."""
+    return totals_from_rows(db.execute(totals_statement()))
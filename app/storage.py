@@ -0,0 +1,250 @@
+"""Content-addressed storage for uploaded files.
+
+``store_upload`` streams an upload to disk while hashing it and files it
+under ``/uploads/blobs/<aa>/<bb>/<sha256><ext>``, so identical files are
+stored once and a blob URL never changes content. ``upload_blobs`` keeps a
+reference count per blob, maintained from ``BuildingPhoto.file_path`` by a
+Session ``after_flush`` listener; when the last photo referencing a blob is
+deleted the row goes away and the file (with its resized variants) is
+removed after the commit.
+
+An upload that deduplicates onto an existing file can race with that
+cleanup, since its photo row is only committed later. ``BlobWriter``
+therefore touches the file it reuses, or writes it again if it is gone, and
+the cleanup moves a file aside before re-checking it, putting it back when
+it is referenced again or was reused within REUSE_GRACE_SECONDS.
+"""
+import glob
+import hashlib
+import os
+import re
+import tempfile
+import time
+from typing import BinaryIO, Dict, Optional, Set
+
+from sqlalchemy import delete, event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+UPLOADS_DIR = os.path.join("app", "uploads")
+BLOBS_DIR = os.path.join(UPLOADS_DIR, "blobs")
+CHUNK_SIZE = 1024 * 1024
+# A released blob touched this recently may be about to get a new photo row
+REUSE_GRACE_SECONDS = 300
+
+_BLOB_URL = re.compile(r"^/uploads/blobs/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(\.[a-z0-9]+)?$")
+_EXT_ALIASES = {".jpeg": ".jpg"}
+
+
+def blob_url(digest: str, ext: str) -> str:
+    return f"/uploads/blobs/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def blob_file(url: str) -> str:
+    return os.path.join(UPLOADS_DIR, *url[len("/uploads/"):].split("/"))
+
+
+def is_blob(url: Optional[str]) -> bool:
+    return bool(url and _BLOB_URL.match(url))
+
+
+def normalized_ext(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,8}", ext):
+        return ""
+    return _EXT_ALIASES.get(ext, ext)
+
+
+class BlobWriter:
+    """Incrementally write one upload into the blob store.
+
+    Chunks go straight to a temp file next to their final location while
+    being hashed; ``commit`` moves the file into place and returns its URL.
+    """
+
+    def __init__(self):
+        os.makedirs(BLOBS_DIR, exist_ok=True)
+        self._digest = hashlib.sha256()
+        self.size = 0
+        fd, self._tmp_path = tempfile.mkstemp(dir=BLOBS_DIR, prefix=".upload-")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._digest.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def close(self) -> None:
+        """Finish writing; ``commit`` or ``abort`` can follow later."""
+        self._file.close()
+
+    def commit(self, ext: str) -> str:
+        self._file.close()
+        url = blob_url(self._digest.hexdigest(), ext)
+        path = blob_file(url)
+        try:
+            # Mark the existing file as reused so a concurrent release keeps it
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._tmp_path, path)
+        else:
+            os.unlink(self._tmp_path)
+        return url
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+
+def store_upload(fileobj: BinaryIO, filename: Optional[str]) -> str:
+    """Write an upload into the blob store and return its ``/uploads/blobs/...`` URL."""
+    writer = BlobWriter()
+    try:
+        while True:
+            chunk = fileobj.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            writer.write(chunk)
+        return writer.commit(normalized_ext(filename))
+    except BaseException:
+        writer.abort()
+        raise
+
+
+def _remove_blob_files(url: str, path: Optional[str] = None) -> None:
+    """Delete a blob (from ``path`` if it was moved aside) and its variants."""
+    path = path or blob_file(url)
+    stem = os.path.splitext(os.path.basename(blob_file(url)))[0]
+    from app.images import VARIANTS_DIR
+
+    for target in [path] + glob.glob(os.path.join(VARIANTS_DIR, f"{stem}_*")):
+        try:
+            os.unlink(target)
+        except FileNotFoundError:
+            pass
+
+
+def _noop_set(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the previous file_path on change so the old blob can be released
+event.listen(models.BuildingPhoto.file_path, "set", _noop_set, retval=True, active_history=True)
+
+
+def _adjust(conn, url: str, delta: int, released: Set[str]) -> None:
+    blobs = models.UploadBlob.__table__
+    result = conn.execute(update(blobs).where(blobs.c.path == url).values(ref_count=blobs.c.ref_count + delta))
+    if result.rowcount == 0:
+        if delta > 0:
+            path = blob_file(url)
+            conn.execute(
+                blobs.insert().values(
+                    path=url,
+                    sha256=_BLOB_URL.match(url).group(1),
+                    size=os.path.getsize(path) if os.path.exists(path) else None,
+                    ref_count=delta,
+                )
+            )
+        return
+    if delta < 0:
+        remaining = conn.execute(select(blobs.c.ref_count).where(blobs.c.path == url)).scalar()
+        if remaining is not None and remaining <= 0:
+            conn.execute(delete(blobs).where(blobs.c.path == url))
+            released.add(url)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_blob_refs(session: Session, flush_context) -> None:
+    deltas: Dict[str, int] = {}
+
+    def bump(url, delta):
+        if is_blob(url):
+            deltas[url] = deltas.get(url, 0) + delta
+
+    for obj in session.new:
+        if isinstance(obj, models.BuildingPhoto):
+            bump(obj.file_path, 1)
+    for obj in session.deleted:
+        if isinstance(obj, models.BuildingPhoto):
+            history = inspect(obj).attrs.file_path.history
+            bump((history.deleted or history.unchanged or [None])[0], -1)
+    for obj in session.dirty:
+        if isinstance(obj, models.BuildingPhoto):
+            history = inspect(obj).attrs.file_path.history
+            if history.has_changes():
+                for old in history.deleted:
+                    bump(old, -1)
+                for new in history.added:
+                    bump(new, 1)
+    deltas = {url: delta for url, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    conn = session.connection()
+    released = session.info.setdefault("released_blobs", set())
+    # Increments first so a photo moved onto a blob it shares never drops it to zero
+    for url, delta in sorted(deltas.items(), key=lambda item: -item[1]):
+        _adjust(conn, url, delta, released)
+
+
+@event.listens_for(Session, "after_commit")
+def _collect_released_blobs(session: Session) -> None:
+    released = session.info.pop("released_blobs", None)
+    if not released:
+        return
+    from app.database import engine
+
+    # Move the files aside first: from here on a deduplicating BlobWriter
+    # finds them missing and writes its own copy.
+    moved = {}
+    for url in released:
+        path = blob_file(url)
+        try:
+            os.replace(path, path + ".released")
+        except FileNotFoundError:
+            continue
+        moved[url] = path
+    if not moved:
+        return
+    with engine.connect() as conn:
+        still_used = set(
+            conn.execute(select(models.UploadBlob.path).where(models.UploadBlob.path.in_(moved))).scalars()
+        )
+    reuse_cutoff = time.time() - REUSE_GRACE_SECONDS
+    for url, path in moved.items():
+        aside = path + ".released"
+        if url in still_used or os.path.getmtime(aside) > reuse_cutoff:
+            # Blobs are content-addressed, so this is the same file as any copy written meanwhile
+            os.replace(aside, path)
+        else:
+            _remove_blob_files(url, aside)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_released_blobs(session: Session) -> None:
+    session.info.pop("released_blobs", None)
+
+
+def collect_garbage(db: Session, grace_seconds: int = 3600) -> int:
+    """Delete blob files with no ``upload_blobs`` row (e.g. from failed requests).
+
+    Files younger than ``grace_seconds`` are kept, since their photo row may
+    not be committed yet.
+    """
+    known = set(db.execute(select(models.UploadBlob.path)).scalars())
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for path in glob.glob(os.path.join(BLOBS_DIR, "*", "*", "*")) + glob.glob(os.path.join(BLOBS_DIR, ".upload-*")):
+        rel = os.path.relpath(path, UPLOADS_DIR).replace(os.sep, "/")
+        if f"/uploads/{rel}" in known or os.path.getmtime(path) > cutoff:
+            continue
+        if is_blob(f"/uploads/{rel}"):
+            _remove_blob_files(f"/uploads/{rel}")
+        else:
+            os.unlink(path)
+        removed += 1
+    return removed
@@ -0,0 +1,108 @@
+"""Per-process cache of the users behind JWTs.
+
+Entries are keyed by the token's ``(sub, iat)`` and hold a snapshot of the
+user's column values, so an authenticated request can skip the users
+lookup. A cached user is attached to the request's session with
+``merge(load=False)``; that needs no SELECT and the instance still flushes
+like a loaded one. A Session ``after_flush``/``after_commit`` listener
+drops entries for users that were updated or deleted (password changes
+included). Other worker processes keep their entries until the TTL
+expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS
+from app import models
+
+
+Key = Tuple[str, Any]
+
+
+class PrincipalCache:
+    """Thread-safe LRU of user snapshots with a per-entry expiry time."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Key, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Key) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return values
+
+    def put(self, key: Key, values: Dict[str, Any], token_exp: Optional[float] = None) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if token_exp:
+            expires_at = min(expires_at, float(token_exp))
+        with self._lock:
+            self._entries[key] = (expires_at, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        ids = set(user_ids)
+        if not ids:
+            return
+        with self._lock:
+            for key in [k for k, (_, values) in self._entries.items() if values.get("id") in ids]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+cache = PrincipalCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
+
+def snapshot(user: models.User) -> Dict[str, Any]:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(models.User).column_attrs}
+
+
+def detached(values: Dict[str, Any]) -> models.User:
+    """A detached User rebuilt from a snapshot, ready for ``session.merge(..., load=False)``."""
+    user = models.User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_users(session: Session, flush_context) -> None:
+    ids = {
+        obj.id
+        for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, models.User) and obj.id is not None
+    }
+    if ids:
+        cache.invalidate(ids)
+        # Drop them again on commit, in case a concurrent request re-cached
+        # the old row between this flush and the commit
+        session.info.setdefault("stale_user_ids", set()).update(ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    cache.invalidate(session.info.pop("stale_user_ids", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session: Session) -> None:
+    session.info.pop("stale_user_ids", None)
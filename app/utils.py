@@ -1,9 +1,19 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
 from passlib.context import CryptContext
 
+from app.config import PASSWORD_HASH_WORKERS
+
 
 # Prefer pbkdf2_sha256 to avoid external bcrypt backend issues
 password_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+# Password given to provisioned accounts; users holding it must change it on login
+DEFAULT_PASSWORD = "12345"
+
 
 def hash_password(plain_password: str) -> str:
     return password_context.hash(plain_password)
@@ -14,3 +24,44 @@ def verify_password(plain_password: str, password_hash: str) -> bool:
         return password_context.verify(plain_password, password_hash)
     except Exception:
         return False
+
+
+# The KDF runs in a dedicated process pool so login bursts do not hold the
+# GIL; PASSWORD_HASH_WORKERS caps how many hashes run at once.
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS or os.cpu_count() or 1)
+    return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=False, cancel_futures=True)
+            _hash_pool = None
+
+
+def pooled_hash_password(plain_password: str) -> str:
+    """hash_password on the hash pool, for sync handlers."""
+    return _pool().submit(hash_password, plain_password).result()
+
+
+def pooled_verify_password(plain_password: str, password_hash: str) -> bool:
+    """verify_password on the hash pool, for sync handlers."""
+    return _pool().submit(verify_password, plain_password, password_hash).result()
+
+
+async def hash_password_async(plain_password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_pool(), hash_password, plain_password)
+
+
+async def verify_password_async(plain_password: str, password_hash: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_pool(), verify_password, plain_password, password_hash)
@@ -0,0 +1,416 @@
+"""Rental request workflow: submission, signer chains and the approval state machine.
+
+``submit_requests`` stores any number of rental requests, their approval
+rows and the resident's notification event (see app/outbox.py) in one
+transaction. The approval rows
+go in as a single bulk INSERT.
+
+A request's approvals are numbered ``step`` 1..``total_steps`` in signing
+order and decided one at a time. ``RentalRequest.current_step`` points at
+the step awaiting a decision. Only that step's approval is "pending"; the
+later ones are "waiting". So a signer's work queue is a range of the
+``(signer_id, status, id)`` index, see ``panel_statement``. ``approve``
+and ``decline`` touch the acted-on approval, the request and at most one
+other approval, however long the chain is:
+
+    request:   pending -> in_progress -> ... -> approved (current_step NULL)
+               pending | in_progress -> rejected (current_step NULL)
+    approval:  waiting -> pending -> approved | declined
+
+Each region's signer chain (its own signers plus the region-less ones, in
+signing order) is cached per process in ``chains``, tagged with the signers
+table's change counter (``table_versions``, see app/conditional.py). A
+cached chain is only used while that counter is unchanged, so a signer
+written by another worker or a script is picked up by the next submission.
+A Session ``after_flush``/``after_commit`` listener also drops the cache
+whenever this process writes a signer, including writes that roll back.
+"""
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import conditional, models, outbox, schemas
+from app.config import PAGE_SIZE_DEFAULT
+
+
+class SignerChains:
+    """region_id -> ordered signer ids, valid for one version of the signers table."""
+
+    def __init__(self):
+        self._chains: Dict[Optional[int], Tuple[int, Tuple[int, ...]]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, region_id: Optional[int]) -> Tuple[int, ...]:
+        version, _ = conditional.table_version(db, models.Signer.__tablename__)
+        with self._lock:
+            cached = self._chains.get(region_id)
+            generation = self._generation
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        chain = tuple(
+            signer_id
+            for (signer_id,) in db.query(models.Signer.id)
+            .filter((models.Signer.region_id == region_id) | (models.Signer.region_id.is_(None)))
+            .order_by(models.Signer.signing_order.asc(), models.Signer.id.asc())
+        )
+        with self._lock:
+            # Not cached if signers changed in this process while it was being read
+            if generation == self._generation:
+                self._chains[region_id] = (version, chain)
+        return chain
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._chains.clear()
+
+
+chains = SignerChains()
+
+
+def submit_requests(
+    db: Session, user: models.User, items: Sequence[schemas.RentalRequestSubmit]
+) -> List[models.RentalRequest]:
+    """Create rental requests with their approval chains and notify the resident, in one commit."""
+    building_ids = {item.building_id for item in items}
+    regions = dict(
+        db.query(models.Building.id, models.Building.region_id).filter(models.Building.id.in_(building_ids))
+    )
+    missing = sorted(building_ids - regions.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Building not found: {', '.join(map(str, missing))}")
+
+    chain_of = [chains.get(db, regions[item.building_id]) for item in items]
+    requests = [
+        models.RentalRequest(
+            user_id=user.id,
+            building_id=item.building_id,
+            selected_spaces=item.selected_spaces,
+            total_price=item.total_price,
+            status="pending",
+            current_step=1 if chain else None,
+            total_steps=len(chain),
+        )
+        for item, chain in zip(items, chain_of)
+    ]
+    db.add_all(requests)
+    db.flush()
+
+    approvals = [
+        {"request_id": rr.id, "signer_id": signer_id, "step": n, "status": "pending" if n == 1 else "waiting"}
+        for rr, chain in zip(requests, chain_of)
+        for n, signer_id in enumerate(chain, 1)
+    ]
+    if approvals:
+        db.execute(insert(models.RequestApproval), approvals)
+
+    if len(requests) == 1:
+        title, message = "Request submitted", f"Rental request #{requests[0].id} submitted."
+    else:
+        ids = ", ".join(f"#{rr.id}" for rr in requests)
+        title, message = "Requests submitted", f"{len(requests)} rental requests submitted: {ids}."
+    outbox.emit(db, "request.submitted", user.id, title, message, request_ids=[rr.id for rr in requests])
+    db.commit()
+    return requests
+
+
+# Signer panel status filter -> approval statuses shown ("waiting" never is)
+PANEL_STATUSES = {
+    "pending": ("pending",),
+    "approved": ("approved",),
+    "declined": ("declined",),
+    "all": ("pending", "approved", "declined"),
+}
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def panel_filters(
+    status: Optional[str], date_from: Optional[str], date_to: Optional[str], before: Optional[str]
+) -> dict:
+    """Signer panel query parameters; anything unparseable falls back to its default."""
+    return {
+        "status": status if status in PANEL_STATUSES else "pending",
+        "date_from": _parse_date(date_from),
+        "date_to": _parse_date(date_to),
+        "before": int(before) if before and before.isdigit() else None,
+    }
+
+
+def panel_statement(signer_id: int, filters: dict, limit: int = PAGE_SIZE_DEFAULT):
+    """One page (plus one row, to tell if there is more) of a signer's approvals, newest first.
+
+    A single joined SELECT of just the columns the panel shows. Filtering on
+    ``(signer_id, status)`` and seeking below the ``before`` id both run on
+    the ``(signer_id, status, id)`` index, so no page needs a count or an
+    OFFSET. The date filters apply to the request's submission date.
+    """
+    ra, rr = models.RequestApproval, models.RentalRequest
+    stmt = (
+        select(
+            ra.id,
+            ra.request_id,
+            ra.step,
+            ra.status,
+            ra.action_at,
+            rr.total_steps,
+            rr.total_price,
+            rr.created_at.label("submitted_at"),
+            models.Building.name.label("building_name"),
+            models.User.email.label("resident_email"),
+        )
+        .join(rr, rr.id == ra.request_id)
+        .outerjoin(models.Building, models.Building.id == rr.building_id)
+        .outerjoin(models.User, models.User.id == rr.user_id)
+        .where(ra.signer_id == signer_id, ra.status.in_(PANEL_STATUSES[filters["status"]]))
+    )
+    if filters["before"] is not None:
+        stmt = stmt.where(ra.id < filters["before"])
+    if filters["date_from"] is not None:
+        stmt = stmt.where(rr.created_at >= datetime.combine(filters["date_from"], datetime.min.time()))
+    if filters["date_to"] is not None:
+        stmt = stmt.where(rr.created_at < datetime.combine(filters["date_to"] + timedelta(days=1), datetime.min.time()))
+    return stmt.order_by(ra.id.desc()).limit(limit + 1)
+
+
+def panel_page(rows: Sequence, filters: dict, limit: int = PAGE_SIZE_DEFAULT) -> dict:
+    """Template context for a page of ``panel_statement`` rows."""
+    rows = list(rows)
+    query = {
+        "status": filters["status"],
+        "date_from": filters["date_from"].isoformat() if filters["date_from"] else "",
+        "date_to": filters["date_to"].isoformat() if filters["date_to"] else "",
+    }
+    older = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        older = urlencode({**query, "before": rows[-1].id})
+    return {
+        "approvals": rows,
+        "filters": query,
+        "statuses": list(PANEL_STATUSES),
+        "older_query": older,
+        "newest_query": urlencode(query) if filters["before"] is not None else None,
+    }
+
+
+# HTTP status of a refused decision -> error code shown to the signer
+ERROR_CODES = {404: "not_found", 403: "not_your_approval", 409: "not_actionable"}
+
+
+def _actionable(db: Session, user: models.User, approval_id: int) -> Tuple[models.RequestApproval, models.RentalRequest]:
+    ra = db.get(models.RequestApproval, approval_id)
+    if ra is None:
+        raise HTTPException(status_code=404, detail="Approval not found")
+    signer = db.get(models.Signer, ra.signer_id)
+    if signer is None or signer.email != user.email:
+        raise HTTPException(status_code=403, detail="Approval belongs to another signer")
+    req = db.get(models.RentalRequest, ra.request_id)
+    if ra.status != "pending" or req is None or req.current_step != ra.step:
+        raise HTTPException(status_code=409, detail="Approval is not awaiting a decision")
+    return ra, req
+
+
+def _leave_step(db: Session, req: models.RentalRequest, step: int, **values) -> None:
+    """Move the request off ``step``; a concurrent decision on the same step makes this fail with 409."""
+    moved = (
+        db.query(models.RentalRequest)
+        .filter(models.RentalRequest.id == req.id, models.RentalRequest.current_step == step)
+        .update(values, synchronize_session="fetch")
+    )
+    if not moved:
+        raise HTTPException(status_code=409, detail="Approval is not awaiting a decision")
+
+
+def approve(db: Session, user: models.User, approval_id: int, comment: Optional[str] = None) -> models.RequestApproval:
+    """Approve the current step and hand the request to the next signer, or finish it. The caller commits."""
+    ra, req = _actionable(db, user, approval_id)
+    ra.status = "approved"
+    ra.action_at = datetime.utcnow()
+    if comment:
+        ra.reason = comment
+    if ra.step < req.total_steps:
+        _leave_step(db, req, ra.step, status="in_progress", current_step=ra.step + 1)
+        db.query(models.RequestApproval).filter(
+            models.RequestApproval.request_id == req.id, models.RequestApproval.step == ra.step + 1
+        ).update({"status": "pending"}, synchronize_session="fetch")
+        return ra
+
+    _leave_step(db, req, ra.step, status="approved", current_step=None)
+    db.add_all(_finalize(req))
+    return ra
+
+
+def decline(db: Session, user: models.User, approval_id: int, reason: str) -> models.RequestApproval:
+    """Decline the current step, which rejects the whole request. The caller commits."""
+    ra, req = _actionable(db, user, approval_id)
+    ra.status = "declined"
+    ra.reason = reason
+    ra.action_at = datetime.utcnow()
+    _leave_step(db, req, ra.step, status="rejected", current_step=None)
+    db.add(_declined_notice(req, reason))
+    return ra
+
+
+def _finalize(req: models.RentalRequest) -> list:
+    """Contract and resident notification for a fully approved request."""
+    return [
+        models.Contract(
+            building_id=req.building_id,
+            user_id=req.user_id,
+            selected_rooms=req.selected_spaces,
+            total_price=req.total_price,
+            zero_risk=False,
+            status="approved",
+        ),
+        outbox.event_for(
+            "request.approved",
+            req.user_id,
+            "Request approved",
+            f"Your request #{req.id} is approved. Contract created.",
+            request_id=req.id,
+        ),
+    ]
+
+
+def _declined_notice(req: models.RentalRequest, reason: str) -> models.OutboxEvent:
+    return outbox.event_for(
+        "request.declined",
+        req.user_id,
+        "Request declined",
+        f"Your request #{req.id} was declined: {reason}",
+        request_id=req.id,
+    )
+
+
+_move_request = (
+    update(models.RentalRequest.__table__)
+    .where(
+        models.RentalRequest.__table__.c.id == bindparam("request_id"),
+        models.RentalRequest.__table__.c.current_step == bindparam("from_step"),
+    )
+    .values(current_step=bindparam("to_step"), status=bindparam("to_status"))
+)
+_activate_step = (
+    update(models.RequestApproval.__table__)
+    .where(
+        models.RequestApproval.__table__.c.request_id == bindparam("rr_id"),
+        models.RequestApproval.__table__.c.step == bindparam("next_step"),
+    )
+    .values(status="pending")
+)
+
+
+def decide_many(
+    db: Session, user: models.User, approval_ids: Sequence[int], action: str, reason: Optional[str] = None
+) -> List[dict]:
+    """Approve or decline many approvals at once; one result per distinct id, in input order. The caller commits.
+
+    Refused items (see ``ERROR_CODES``) are reported and skipped. The others
+    are applied with one UPDATE for the approvals, one executemany UPDATE
+    each for the requests and the next steps, and a single flush of the
+    contracts and notification events. A signer holding consecutive steps
+    of a request may decide them in the same call. If a request moved on since
+    it was read, nothing is applied and 409 is raised.
+    """
+    ids = list(dict.fromkeys(approval_ids))
+    rows = {
+        ra.id: (ra, req, email)
+        for ra, req, email in db.query(models.RequestApproval, models.RentalRequest, models.Signer.email)
+        .outerjoin(models.RentalRequest, models.RentalRequest.id == models.RequestApproval.request_id)
+        .outerjoin(models.Signer, models.Signer.id == models.RequestApproval.signer_id)
+        .filter(models.RequestApproval.id.in_(ids))
+    }
+    results = {approval_id: {"id": approval_id, "error": ERROR_CODES[404]} for approval_id in ids}
+
+    decided: List[int] = []
+    moves: Dict[int, dict] = {}  # request id -> its _move_request parameters
+    touched: List[models.RentalRequest] = []
+    for approval_id in sorted(rows, key=lambda i: (rows[i][0].request_id or 0, rows[i][0].step or 0)):
+        ra, req, email = rows[approval_id]
+        result = results[approval_id]
+        result["request_id"] = ra.request_id
+        move = moves.get(ra.request_id)
+        step = move["to_step"] if move else (req.current_step if req is not None else None)
+        if email is None or email != user.email:
+            result["error"] = ERROR_CODES[403]
+            continue
+        # "waiting" is fine once an earlier step in this call handed the request to it
+        if req is None or step is None or ra.step != step or ra.status not in ("pending", "waiting"):
+            result["error"] = ERROR_CODES[409]
+            continue
+
+        if move is None:
+            move = moves[req.id] = {"request_id": req.id, "from_step": req.current_step}
+            touched.append(req)
+        if action == "approve" and step < req.total_steps:
+            move.update(to_step=step + 1, to_status="in_progress")
+        else:
+            move.update(to_step=None, to_status="approved" if action == "approve" else "rejected")
+        decided.append(approval_id)
+        result.update(error=None, status="approved" if action == "approve" else "declined")
+
+    if decided:
+        values = {"status": "approved" if action == "approve" else "declined", "action_at": datetime.utcnow()}
+        if reason:
+            values["reason"] = reason
+        db.execute(
+            update(models.RequestApproval.__table__)
+            .where(models.RequestApproval.__table__.c.id.in_(decided))
+            .values(**values)
+        )
+        moved = db.execute(_move_request, list(moves.values())).rowcount
+        if moved != len(moves):
+            raise HTTPException(status_code=409, detail="Some requests were decided concurrently; nothing was applied")
+        next_steps = [
+            {"rr_id": m["request_id"], "next_step": m["to_step"]} for m in moves.values() if m["to_step"] is not None
+        ]
+        if next_steps:
+            db.execute(_activate_step, next_steps)
+
+        notices = []
+        for req in touched:
+            if moves[req.id]["to_status"] == "approved":
+                notices.extend(_finalize(req))
+            elif moves[req.id]["to_status"] == "rejected":
+                notices.append(_declined_notice(req, reason))
+        db.add_all(notices)
+        db.flush()
+
+    for result in results.values():
+        move = moves.get(result.get("request_id"))
+        if move is not None and result["error"] is None:
+            result["request_status"] = move["to_status"]
+    return [results[approval_id] for approval_id in ids]
+
+
+@event.listens_for(Session, "after_flush")
+def _track_signer_writes(session: Session, flush_context) -> None:
+    if any(isinstance(obj, models.Signer) for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        chains.invalidate()
+        # Again on commit, in case another request re-cached the old chain meanwhile
+        session.info["signer_chains_stale"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_chains(session: Session) -> None:
+    if session.info.pop("signer_chains_stale", False):
+        chains.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_chains(session: Session) -> None:
+    # The session may have cached its own uncommitted chain before rolling back
+    if session.info.pop("signer_chains_stale", False):
+        chains.invalidate()
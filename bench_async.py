@@ -0,0 +1,139 @@
+"""Compare requests/second of the sync and async handlers for the hot routes.
+
+Usage: python bench_async.py [seconds_per_route] [concurrency]
+
+Starts uvicorn twice against the current DATABASE_URL, once with
+ASYNC_ROUTES=0 and once with ASYNC_ROUTES=1, and drives each route with
+`concurrency` keep-alive clients. Authenticated routes use a token for the
+first superadmin, signer and resident found in the database.
+"""
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from app.auth import create_access_token
+from app.database import SessionLocal
+from app import models
+
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+def _first_email(db, role):
+    user = db.query(models.User).filter(models.User.role == role).first()
+    return user.email if user else None
+
+
+def routes():
+    """(path, token or None) pairs to benchmark."""
+    with SessionLocal() as db:
+        admin = _first_email(db, "superadmin")
+        signer = db.query(models.Signer.email).filter(models.Signer.email.isnot(None)).first()
+        resident = _first_email(db, "resident") or _first_email(db, "user")
+        building = db.query(models.Building.id).first()
+    result = [("/", None), ("/?q=a", None)]
+    if building:
+        result.append((f"/building/{building[0]}", None))
+    if resident:
+        result.append(("/residentpanel", create_access_token(resident)))
+    if signer:
+        result.append(("/signerpanel", create_access_token(signer[0])))
+    if admin:
+        token = create_access_token(admin)
+        result += [("/dashboard/summary", token), ("/dashboard/regions", token), ("/dashboard/buildings", token)]
+    return result
+
+
+def wait_for_server(timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(HOST, PORT, timeout=1)
+            conn.request("GET", "/login")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("uvicorn did not start")
+
+
+def _worker(method, path, headers, body, stop_at, counts, index):
+    conn = http.client.HTTPConnection(HOST, PORT, timeout=30)
+    done = errors = 0
+    while time.time() < stop_at:
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+            done += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(HOST, PORT, timeout=30)
+    conn.close()
+    counts[index] = (done, errors)
+
+
+def measure(path, seconds, concurrency, headers=None, method="GET", body=None):
+    """(requests/second, error count) for `concurrency` clients hitting one route."""
+    counts = [(0, 0)] * concurrency
+    stop_at = time.time() + seconds
+    threads = [
+        threading.Thread(target=_worker, args=(method, path, headers or {}, body, stop_at, counts, i))
+        for i in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    done = sum(c[0] for c in counts)
+    errors = sum(c[1] for c in counts)
+    return done / seconds, errors
+
+
+@contextmanager
+def serve(**env_overrides):
+    """Run uvicorn on HOST:PORT with extra environment variables for the duration of the block."""
+    env = dict(os.environ, **env_overrides)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", HOST, "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        wait_for_server()
+        yield
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run(async_routes: bool, targets, seconds, concurrency):
+    with serve(ASYNC_ROUTES="1" if async_routes else "0"):
+        return {
+            path: measure(path, seconds, concurrency, {"Cookie": f"access_token={token}"} if token else None)
+            for path, token in targets
+        }
+
+
+def main(seconds: str = "5", concurrency: str = "32") -> None:
+    seconds, concurrency = float(seconds), int(concurrency)
+    targets = routes()
+    sync = run(False, targets, seconds, concurrency)
+    async_ = run(True, targets, seconds, concurrency)
+    print(f"{'route':<24} {'sync req/s':>12} {'async req/s':>12} {'change':>8}")
+    for path, _ in targets:
+        (s_rps, s_err), (a_rps, a_err) = sync[path], async_[path]
+        change = f"{(a_rps / s_rps - 1) * 100:+.0f}%" if s_rps else "n/a"
+        errors = f"  errors sync={s_err} async={a_err}" if s_err or a_err else ""
+        print(f"{path:<24} {s_rps:>12.1f} {a_rps:>12.1f} {change:>8}{errors}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:3])
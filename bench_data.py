@@ -0,0 +1,183 @@
+"""Generate a deterministic benchmark dataset in a scratch SQLite database.
+
+Usage: python bench_data.py [path] [scale] [seed]
+
+Creates (or replaces) `path` (default bench.db) with the schema from
+app/models.py and fills it with regions, buildings, rooms, photos,
+amenities, signers, residents and pending rental requests with their
+approval chains. `scale` multiplies the number of regions, residents and
+requests. The same seed always produces the same rows. Every account's
+password is "bench".
+"""
+import json
+import os
+import random
+import sys
+from typing import Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.database import Base, make_engine
+from app.utils import hash_password
+from app import models, search, stats
+
+
+PASSWORD = "bench"
+ADMIN_EMAIL = "admin@bench.local"
+
+REGIONS = 4
+BUILDINGS_PER_REGION = 15
+ROOMS_PER_BUILDING = 12
+PHOTOS_PER_BUILDING = 3
+SIGNERS_PER_REGION = 3
+RESIDENTS = 50
+REQUESTS = 500
+
+CITIES = ["Nukus", "Tashkent", "Samarkand", "Bukhara", "Khiva", "Andijan", "Namangan", "Fergana"]
+AMENITIES = ["Parking", "Wi-Fi", "Conference room", "Kitchen", "24/7 access", "Security", "Elevator", "Cafe"]
+STREETS = ["Amir Temur", "Navoi", "Mustaqillik", "Bunyodkor", "Shota Rustaveli", "Babur"]
+PHOTO = "/static/images/default.jpg"
+
+
+def scratch_url(path: str) -> str:
+    return f"sqlite:///{os.path.abspath(path)}"
+
+
+def generate(db: Session, scale: int = 1, seed: int = 42) -> Dict[str, int]:
+    """Fill an empty database; returns the row count per table."""
+    rng = random.Random(seed)
+    password_hash = hash_password(PASSWORD)
+
+    amenities = [models.Amenity(name=name, is_active=True) for name in AMENITIES]
+    db.add_all(amenities)
+    db.add(models.User(name="Bench Admin", email=ADMIN_EMAIL, password_hash=password_hash, role="superadmin"))
+
+    buildings = []
+    signers_by_region = {}
+    for r in range(REGIONS * scale):
+        region = models.Region(name=f"Region {r + 1}")
+        db.add(region)
+        db.flush()
+        signers = []
+        for order in range(1, SIGNERS_PER_REGION + 1):
+            email = f"signer{r + 1}-{order}@bench.local"
+            db.add(
+                models.User(
+                    name=f"Signer {r + 1}.{order}",
+                    email=email,
+                    password_hash=password_hash,
+                    role="signer",
+                    region_id=region.id,
+                )
+            )
+            signer = models.Signer(
+                name=f"Signer {r + 1}.{order}",
+                position=["Director", "Deputy", "Lawyer", "Accountant"][order % 4],
+                email=email,
+                phone=f"+998 90 {r:03d} {order:04d}",
+                region_id=region.id,
+                signing_order=order,
+                status="active",
+            )
+            db.add(signer)
+            signers.append(signer)
+        signers_by_region[region.id] = signers
+
+        for b in range(BUILDINGS_PER_REGION):
+            floors = rng.randint(2, 12)
+            building = models.Building(
+                name=f"{rng.choice(['IT Park', 'Tech Hub', 'Innovation Center', 'Business Tower'])} {r + 1}-{b + 1}",
+                address=f"{rng.randint(1, 200)} {rng.choice(STREETS)} street",
+                city=rng.choice(CITIES),
+                region_id=region.id,
+                floors=floors,
+                total_area=round(rng.uniform(800, 12000), 1),
+                price_per_m2=round(rng.uniform(5, 40), 2),
+            )
+            building.amenities_rel = rng.sample(amenities, 3)
+            for n in range(ROOMS_PER_BUILDING):
+                building.rooms.append(
+                    models.Room(
+                        floor=n % floors + 1,
+                        room_number=f"{n % floors + 1}{n:02d}",
+                        area=round(rng.uniform(15, 250), 1),
+                        status="free" if rng.random() < 0.7 else "booked",
+                    )
+                )
+            for _ in range(PHOTOS_PER_BUILDING):
+                building.photos.append(models.BuildingPhoto(file_path=PHOTO, is_360=False))
+            db.add(building)
+            buildings.append(building)
+    db.flush()
+
+    residents = []
+    for i in range(RESIDENTS * scale):
+        resident = models.User(
+            name=f"Resident {i + 1}",
+            email=f"resident{i + 1}@bench.local",
+            password_hash=password_hash,
+            role="resident",
+            region_id=rng.choice(buildings).region_id,
+        )
+        db.add(resident)
+        residents.append(resident)
+    db.flush()
+
+    for _ in range(REQUESTS * scale):
+        building = rng.choice(buildings)
+        rooms = rng.sample(building.rooms, rng.randint(1, 3))
+        request = models.RentalRequest(
+            user_id=rng.choice(residents).id,
+            building_id=building.id,
+            selected_spaces=json.dumps([room.id for room in rooms]),
+            total_price=round(sum(room.area for room in rooms) * building.price_per_m2, 2),
+            status="pending",
+            current_step=1,
+            total_steps=SIGNERS_PER_REGION,
+        )
+        db.add(request)
+        db.flush()
+        for step, signer in enumerate(signers_by_region[building.region_id], 1):
+            db.add(
+                models.RequestApproval(
+                    request_id=request.id,
+                    signer_id=signer.id,
+                    step=step,
+                    status="pending" if step == 1 else "waiting",
+                )
+            )
+    db.commit()
+
+    stats.rebuild(db)
+    return {
+        table.name: db.execute(select(func.count()).select_from(table)).scalar()
+        for table in sorted(Base.metadata.sorted_tables, key=lambda t: t.name)
+    }
+
+
+def create(path: str = "bench.db", scale: int = 1, seed: int = 42) -> Dict[str, int]:
+    """Replace `path` with a freshly generated dataset."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    engine = make_engine(scratch_url(path))
+    try:
+        Base.metadata.create_all(bind=engine)
+        with Session(bind=engine) as db:
+            counts = generate(db, scale, seed)
+        search.ensure_search_index(engine)
+    finally:
+        engine.dispose()
+    return counts
+
+
+def main(path: str = "bench.db", scale: str = "1", seed: str = "42") -> None:
+    counts = create(path, int(scale), int(seed))
+    for table in sorted(counts):
+        print(f"{table}: {counts[table]}")
+    print(f"Benchmark data written to {path}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:4])
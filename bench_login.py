@@ -0,0 +1,57 @@
+"""Measure login throughput, and catalog throughput during a login burst.
+
+Usage: python bench_login.py [seconds] [concurrency] [workers,...]
+
+Creates a bench user in the current DATABASE_URL if needed, then for each
+PASSWORD_HASH_WORKERS value (default "1,0"; 0 = one per CPU) starts uvicorn
+and posts /auth/login from `concurrency` clients while another
+`concurrency` clients load the catalog page.
+"""
+import sys
+import threading
+from urllib.parse import urlencode
+
+from app.database import SessionLocal
+from app.utils import hash_password
+from app import models
+from bench_async import measure, serve
+
+
+EMAIL = "bench-login@example.com"
+PASSWORD = "bench-password"
+
+
+def ensure_bench_user() -> None:
+    with SessionLocal() as db:
+        if not db.query(models.User).filter(models.User.email == EMAIL).first():
+            db.add(models.User(name="Bench", email=EMAIL, password_hash=hash_password(PASSWORD), role="resident"))
+            db.commit()
+
+
+def run(workers: str, seconds: float, concurrency: int):
+    body = urlencode({"email": EMAIL, "password": PASSWORD})
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    results = {}
+    with serve(PASSWORD_HASH_WORKERS=workers):
+        catalog = threading.Thread(
+            target=lambda: results.__setitem__("catalog", measure("/", seconds, concurrency))
+        )
+        catalog.start()
+        results["login"] = measure("/auth/login", seconds, concurrency, headers, method="POST", body=body)
+        catalog.join()
+    return results
+
+
+def main(seconds: str = "5", concurrency: str = "16", workers: str = "1,0") -> None:
+    seconds, concurrency = float(seconds), int(concurrency)
+    ensure_bench_user()
+    print(f"{'hash workers':<14} {'logins/s':>10} {'catalog req/s':>14}")
+    for value in workers.split(","):
+        results = run(value, seconds, concurrency)
+        (login_rps, login_err), (catalog_rps, catalog_err) = results["login"], results["catalog"]
+        errors = f"  errors login={login_err} catalog={catalog_err}" if login_err or catalog_err else ""
+        print(f"{value:<14} {login_rps:>10.1f} {catalog_rps:>14.1f}{errors}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:4])
@@ -0,0 +1,308 @@
+"""Reproducible load test of the main user journeys, reported as JSON.
+
+Usage: python bench_suite.py [seconds_per_scenario] [concurrency] [scale] [output.json]
+       python bench_suite.py compare baseline.json candidate.json [max_regression_pct]
+
+Generates a fresh scratch database (bench.db, see bench_data.py) and starts
+uvicorn on it. Each scenario is then driven by `concurrency` keep-alive
+clients for `seconds_per_scenario`:
+
+- catalog:   anonymous browsing of /, filtered catalog pages and /building/{id}
+- submit:    residents posting /rental-requests
+- approvals: signers approving the pending chains step by step
+- admin:     superadmin dashboard page and its JSON feeds
+
+The report has the requests, errors, throughput and p50/p95/p99/max latency
+of each scenario, and is written to `output.json` (default
+bench-results.json). `compare` prints the change between two reports. It
+exits with status 1 when a scenario's p95 latency or throughput got worse by
+more than `max_regression_pct` (default 10).
+"""
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from sqlalchemy.orm import Session
+
+from app.auth import create_access_token
+from app.database import make_engine
+from app import models
+from bench_async import HOST, PORT, serve
+import bench_data
+
+
+SCRATCH_DB = "bench.db"
+
+# (method, path, headers, body); None ends the client
+Call = Optional[Tuple[str, str, Dict[str, str], Optional[str]]]
+Scenario = Callable[[int, random.Random], Call]
+
+FORM = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def _cookie(email: str) -> Dict[str, str]:
+    return {"Cookie": f"access_token={create_access_token(email)}"}
+
+
+def load_fixtures(path: str) -> dict:
+    """Ids and accounts the scenarios pick from."""
+    engine = make_engine(bench_data.scratch_url(path))
+    try:
+        with Session(bind=engine) as db:
+            signer_email = dict(db.query(models.Signer.id, models.Signer.email))
+            chains: Dict[int, List[Tuple[int, str]]] = {}
+            for request_id, approval_id, signer_id in (
+                db.query(models.RequestApproval.request_id, models.RequestApproval.id, models.RequestApproval.signer_id)
+                .filter(models.RequestApproval.status.in_(("pending", "waiting")))
+                .order_by(models.RequestApproval.request_id, models.RequestApproval.step)
+            ):
+                chains.setdefault(request_id, []).append((approval_id, signer_email[signer_id]))
+            return {
+                "regions": [r for (r,) in db.query(models.Region.id)],
+                "buildings": [b for (b,) in db.query(models.Building.id)],
+                "rooms": _rooms_by_building(db),
+                "residents": [e for (e,) in db.query(models.User.email).filter(models.User.role == "resident")],
+                "approval_chains": list(chains.values()),
+            }
+    finally:
+        engine.dispose()
+
+
+def _rooms_by_building(db: Session) -> Dict[int, List[Tuple[int, float]]]:
+    rooms: Dict[int, List[Tuple[int, float]]] = {}
+    for room_id, building_id, area in db.query(models.Room.id, models.Room.building_id, models.Room.area):
+        rooms.setdefault(building_id, []).append((room_id, area))
+    return rooms
+
+
+def catalog_scenario(fixtures: dict) -> Scenario:
+    buildings = fixtures["buildings"]
+
+    def next_call(client: int, rng: random.Random) -> Call:
+        roll = rng.random()
+        if roll < 0.3:
+            path = "/"
+        elif roll < 0.5:
+            path = f"/?region={rng.choice(fixtures['regions'])}&max_price={rng.choice([10, 20, 30])}"
+        elif roll < 0.6:
+            path = "/?q=" + rng.choice(["tech", "park", "parking", "tower"])
+        else:
+            path = f"/building/{rng.choice(buildings)}"
+        return "GET", path, {}, None
+
+    return next_call
+
+
+def submit_scenario(fixtures: dict) -> Scenario:
+    cookies = [_cookie(email) for email in fixtures["residents"]]
+    buildings = sorted(fixtures["rooms"])
+
+    def next_call(client: int, rng: random.Random) -> Call:
+        building_id = rng.choice(buildings)
+        rooms = rng.sample(fixtures["rooms"][building_id], min(2, len(fixtures["rooms"][building_id])))
+        body = urlencode(
+            {
+                "building_id": building_id,
+                "selected_spaces": json.dumps([room_id for room_id, _ in rooms]),
+                "total_price": round(sum(area for _, area in rooms) * 20, 2),
+            }
+        )
+        return "POST", "/rental-requests", {**FORM, **cookies[client % len(cookies)]}, body
+
+    return next_call
+
+
+def approvals_scenario(fixtures: dict) -> Scenario:
+    # Steps must be decided in order, so each client works through whole chains
+    chains = iter(fixtures["approval_chains"])
+    lock = threading.Lock()
+    cookies: Dict[str, Dict[str, str]] = {}
+    current: Dict[int, List[Tuple[int, str]]] = {}
+
+    def next_call(client: int, rng: random.Random) -> Call:
+        with lock:
+            if not current.get(client):
+                current[client] = list(next(chains, []))
+            if not current[client]:
+                return None
+            approval_id, email = current[client].pop(0)
+            cookie = cookies.setdefault(email, _cookie(email))
+        return "POST", f"/request-approvals/{approval_id}/approve", {**FORM, **cookie}, urlencode({"comment": "ok"})
+
+    return next_call
+
+
+def admin_scenario(fixtures: dict) -> Scenario:
+    cookie = _cookie(bench_data.ADMIN_EMAIL)
+    paths = [
+        "/admin",
+        "/dashboard/summary",
+        "/dashboard/regions",
+        "/dashboard/buildings",
+        "/admin/data/buildings",
+        "/admin/data/users",
+    ]
+
+    def next_call(client: int, rng: random.Random) -> Call:
+        return "GET", rng.choice(paths), cookie, None
+
+    return next_call
+
+
+SCENARIOS = {
+    "catalog": catalog_scenario,
+    "submit": submit_scenario,
+    "approvals": approvals_scenario,
+    "admin": admin_scenario,
+}
+
+
+def _client(scenario: Scenario, index: int, stop_at: float, seed: int, results: list) -> None:
+    rng = random.Random(seed * 1000 + index)
+    conn = http.client.HTTPConnection(HOST, PORT, timeout=30)
+    latencies: List[float] = []
+    errors = 0
+    while time.time() < stop_at:
+        call = scenario(index, rng)
+        if call is None:
+            break
+        method, path, headers, body = call
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(HOST, PORT, timeout=30)
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+    results[index] = (latencies, errors)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def drive(scenario: Scenario, seconds: float, concurrency: int, seed: int) -> dict:
+    results: list = [([], 0)] * concurrency
+    started = time.perf_counter()
+    stop_at = time.time() + seconds
+    threads = [
+        threading.Thread(target=_client, args=(scenario, i, stop_at, seed, results)) for i in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": _ms(percentile(latencies, 50)),
+            "p95": _ms(percentile(latencies, 95)),
+            "p99": _ms(percentile(latencies, 99)),
+            "max": _ms(latencies[-1]) if latencies else 0.0,
+            "mean": _ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+        },
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(seconds: float, concurrency: int, scale: int, seed: int = 42) -> dict:
+    counts = bench_data.create(SCRATCH_DB, scale, seed)
+    fixtures = load_fixtures(SCRATCH_DB)
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seconds_per_scenario": seconds,
+            "concurrency": concurrency,
+            "scale": scale,
+            "seed": seed,
+            "dataset": counts,
+            "env": {k: v for k, v in os.environ.items() if k in ("ASYNC_ROUTES", "DB_PROFILE", "PAGE_CACHE_TTL_SECONDS")},
+        },
+        "scenarios": {},
+    }
+    with serve(DATABASE_URL=bench_data.scratch_url(SCRATCH_DB), DATABASE_REPLICA_URL=""):
+        for name, build in SCENARIOS.items():
+            report["scenarios"][name] = drive(build(fixtures), seconds, concurrency, seed)
+    return report
+
+
+def compare(baseline_path: str, candidate_path: str, max_regression_pct: str = "10") -> int:
+    with open(baseline_path) as f:
+        baseline = json.load(f)["scenarios"]
+    with open(candidate_path) as f:
+        candidate = json.load(f)["scenarios"]
+    limit = float(max_regression_pct)
+    regressions = 0
+    print(f"{'scenario':<10} {'metric':<8} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for name in sorted(set(baseline) & set(candidate)):
+        old, new = baseline[name], candidate[name]
+        rows = [(p, old["latency_ms"][p], new["latency_ms"][p], False) for p in ("p50", "p95", "p99")]
+        rows.append(("req/s", old["throughput_rps"], new["throughput_rps"], True))
+        for metric, before, after, higher_is_better in rows:
+            change = (after / before - 1) * 100 if before else 0.0
+            worse = -change if higher_is_better else change
+            flag = ""
+            if metric in ("p95", "req/s") and worse > limit:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{name:<10} {metric:<8} {before:>10.2f} {after:>10.2f} {change:>+7.1f}%{flag}")
+    return 1 if regressions else 0
+
+
+def main(seconds: str = "10", concurrency: str = "16", scale: str = "1", output: str = "bench-results.json") -> None:
+    report = run(float(seconds), int(concurrency), int(scale))
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{'scenario':<10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{name:<10} {result['throughput_rps']:>8.1f} {latency['p50']:>8.2f} {latency['p95']:>8.2f} "
+            f"{latency['p99']:>8.2f} {result['errors']:>7}"
+        )
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["compare"]:
+        sys.exit(compare(*sys.argv[2:5]))
+    main(*sys.argv[1:5])
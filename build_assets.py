@@ -0,0 +1,52 @@
+"""Write .gz (and, with the Brotli package, .br) sidecars for text assets in app/static.
+
+Usage: python build_assets.py
+
+Run after changing files under app/static; the static mount serves a sidecar
+only while it is at least as new as its source file.
+"""
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from app.assets import STATIC_DIR
+
+
+COMPRESSIBLE = {".css", ".js", ".svg", ".html", ".json", ".txt", ".map"}
+
+
+def compress(path: str) -> list:
+    with open(path, "rb") as f:
+        data = f.read()
+    written = []
+    sidecars = [(".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        sidecars.append((".br", lambda d: brotli.compress(d, quality=11)))
+    for suffix, encode in sidecars:
+        encoded = encode(data)
+        # Not worth serving an encoding that does not shrink the file
+        if len(encoded) >= len(data):
+            continue
+        with open(path + suffix, "wb") as out:
+            out.write(encoded)
+        written.append(path + suffix)
+    return written
+
+
+def main():
+    count = 0
+    for root, _, files in os.walk(STATIC_DIR):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                count += len(compress(os.path.join(root, name)))
+    if brotli is None:
+        print("Brotli not installed; wrote gzip sidecars only")
+    print(f"Wrote {count} precompressed sidecar file(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Deliver pending notification events from the outbox (see app/outbox.py).
+
+Usage: python dispatch_outbox.py [once]
+
+Runs until interrupted, polling every OUTBOX_POLL_SECONDS; with `once` it
+delivers everything currently due and exits. Use it with
+OUTBOX_DISPATCHER=0 to move delivery out of the web workers, or to drain
+the outbox by hand. Several dispatchers can run at once.
+"""
+import sys
+import time
+
+from app import outbox
+from app.config import OUTBOX_POLL_SECONDS
+
+
+def main(mode: str = "loop") -> None:
+    channels = outbox.configured_channels()
+    if mode == "once":
+        print(f"Processed {outbox.drain(channels)} outbox events")
+        return
+    try:
+        while True:
+            handled = outbox.drain(channels)
+            if handled:
+                print(f"Processed {handled} outbox events", flush=True)
+            time.sleep(OUTBOX_POLL_SECONDS)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,18 @@
+import sys
+
+from app.database import SessionLocal
+from app import storage
+
+
+def main(grace_seconds: str = "3600"):
+    """Remove stored upload blobs that no photo references."""
+    db = SessionLocal()
+    try:
+        removed = storage.collect_garbage(db, int(grace_seconds))
+        print(f"Removed {removed} unreferenced upload blob(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,35 @@
+import json
+
+from app.database import SessionLocal
+from app import images, models
+
+
+def main():
+    """Generate resized variants for uploaded photos that do not have them yet."""
+    db = SessionLocal()
+    try:
+        photos = (
+            db.query(models.BuildingPhoto)
+            .filter(models.BuildingPhoto.variants.is_(None), models.BuildingPhoto.is_360.isnot(True))
+            .all()
+        )
+        done = 0
+        for photo in photos:
+            if not images.upload_file(photo.file_path):
+                continue
+            try:
+                variants = images.make_variants(photo.file_path)
+            except OSError as exc:
+                print(f"Skipping photo {photo.id} ({photo.file_path}): {exc}")
+                continue
+            if variants:
+                photo.variants = json.dumps(variants)
+                db.commit()
+                done += 1
+        print(f"Generated variants for {done} photo(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
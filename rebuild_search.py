@@ -0,0 +1,16 @@
+from app.database import SessionLocal, engine
+from app import search
+
+
+def main():
+    search.ensure_search_index(engine)
+    db = SessionLocal()
+    try:
+        search.rebuild(db)
+        print("Building search index rebuilt")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
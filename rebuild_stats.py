@@ -0,0 +1,18 @@
+from app.database import SessionLocal
+from app import stats
+
+
+def main():
+    db = SessionLocal()
+    try:
+        stats.rebuild(db)
+        totals = stats.totals(db)
+        for metric in sorted(totals):
+            print(f"{metric}: {sum(totals[metric].values())}")
+        print("Stat counters rebuilt")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import sys
+import time
+
+from app.database import sync_sqlite_replica
+
+
+def main():
+    # Optional argument: repeat every N seconds
+    interval = float(sys.argv[1]) if len(sys.argv) > 1 else 0
+    while True:
+        sync_sqlite_replica()
+        print("Replica synced from primary")
+        if not interval:
+            return
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    main()
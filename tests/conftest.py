@@ -0,0 +1,14 @@
+"""Point the app at a scratch SQLite database before it is imported."""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_scratch = tempfile.mkdtemp(prefix="rent-platform-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'test.db')}"
+os.environ.setdefault("OUTBOX_DISPATCHER", "0")
+
+# Templates, static files and uploads are resolved relative to the repo root
+os.chdir(ROOT)
+os.makedirs(os.path.join("app", "uploads"), exist_ok=True)
+sys.path.insert(0, ROOT)
@@ -0,0 +1,80 @@
+"""The dashboard endpoints must issue a fixed number of statements, whatever the data size."""
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.auth import create_access_token
+from app.database import SessionLocal
+from app.main import app
+from app import models
+
+
+ADMIN_EMAIL = "dashboard-admin@test.local"
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+def add_regions(count: int) -> None:
+    with SessionLocal() as db:
+        for r in range(count):
+            region = models.Region(name=f"Region {r}")
+            db.add(region)
+            db.flush()
+            for b in range(3):
+                building = models.Building(name=f"B{r}-{b}", city="Nukus", region_id=region.id, price_per_m2=10.0)
+                building.rooms = [models.Room(floor=1, room_number=str(n), area=20, status="free") for n in range(4)]
+                building.photos = [models.BuildingPhoto(file_path="/static/images/default.jpg", is_360=False)]
+                db.add(building)
+                db.flush()
+                db.add(models.Contract(building_id=building.id, status="approved"))
+        db.commit()
+
+
+@pytest.fixture(scope="module")
+def client():
+    with SessionLocal() as db:
+        if not db.query(models.User).filter_by(email=ADMIN_EMAIL).first():
+            db.add(models.User(name="Admin", email=ADMIN_EMAIL, password_hash="x", role="superadmin"))
+            db.commit()
+    client = TestClient(app)
+    client.cookies.set("access_token", create_access_token(ADMIN_EMAIL))
+    return client
+
+
+def statements_for(client, path: str) -> int:
+    client.get(path)  # warm the token user cache
+    with count_statements() as statements:
+        response = client.get(path)
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/dashboard/summary", 1),  # stat_counters
+        ("/dashboard/regions", 1),  # one grouped region query
+        ("/dashboard/buildings", 1),  # one grouped building query
+    ],
+)
+def test_dashboard_query_count_is_constant(client, path, expected):
+    add_regions(1)
+    small = statements_for(client, path)
+    add_regions(5)
+    large = statements_for(client, path)
+    assert small == large == expected
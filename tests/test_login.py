@@ -0,0 +1,31 @@
+"""Accounts that predate ``must_change_password`` get the flag on their next login."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app import models
+from app.utils import DEFAULT_PASSWORD, hash_password
+
+
+@pytest.mark.parametrize(
+    "email, password, redirect, flag",
+    [
+        ("legacy-default@test.local", DEFAULT_PASSWORD, "/change-password", True),
+        ("legacy-changed@test.local", "s3cret-pass", "/residentpanel", False),
+    ],
+)
+def test_login_sets_unknown_must_change_flag(email, password, redirect, flag):
+    with SessionLocal() as db:
+        db.add(models.User(name="Legacy", email=email, password_hash=hash_password(password), role="resident"))
+        db.flush()
+        # As left by the migration for accounts created before the column
+        db.query(models.User).filter_by(email=email).update({"must_change_password": None})
+        db.commit()
+
+    response = TestClient(app).post("/login", data={"email": email, "password": password}, follow_redirects=False)
+
+    assert response.status_code == 302
+    assert response.headers["location"] == redirect
+    with SessionLocal() as db:
+        assert db.query(models.User).filter_by(email=email).one().must_change_password is flag
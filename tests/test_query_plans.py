@@ -0,0 +1,91 @@
+"""The hot filter queries must be served by an index, never a full table scan.
+
+The plans are taken on a scratch in-memory database built from the models,
+so this checks the index set declared there.
+"""
+import pytest
+from sqlalchemy import create_engine, or_
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base
+from app import models, workflow
+
+
+def hot_queries(db):
+    """(label, ORM query or select()) pairs mirroring the filters used by the request handlers."""
+    return [
+        (
+            "free rooms of a building",
+            db.query(models.Room).filter(models.Room.building_id == 1, models.Room.status == "free"),
+        ),
+        (
+            "photos of a building",
+            db.query(models.BuildingPhoto).filter(models.BuildingPhoto.building_id == 1),
+        ),
+        (
+            "photos of catalog page buildings",
+            db.query(models.BuildingPhoto).filter(models.BuildingPhoto.building_id.in_([1, 2, 3])),
+        ),
+        (
+            "next approval step of a request",
+            db.query(models.RequestApproval).filter(
+                models.RequestApproval.request_id == 1, models.RequestApproval.step == 2
+            ),
+        ),
+        (
+            "signer panel: pending page",
+            workflow.panel_statement(1, workflow.panel_filters("pending", None, None, "500")),
+        ),
+        (
+            "signer panel: all statuses, dated",
+            workflow.panel_statement(1, workflow.panel_filters("all", "2025-01-01", "2025-12-31", None)),
+        ),
+        (
+            "latest notifications of a user",
+            db.query(models.Notification)
+            .filter(models.Notification.user_id == 1)
+            .order_by(models.Notification.created_at.desc())
+            .limit(20),
+        ),
+        (
+            "signer chain of a region",
+            db.query(models.Signer)
+            .filter(or_(models.Signer.region_id == 1, models.Signer.region_id.is_(None)))
+            .order_by(models.Signer.signing_order.asc()),
+        ),
+        (
+            "catalog filtered by region and price",
+            db.query(models.Building).filter(models.Building.region_id == 1, models.Building.price_per_m2 <= 100.0),
+        ),
+    ]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+LABELS = [label for label, _ in hot_queries(Session())]
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_hot_query_uses_an_index(engine, db, label):
+    query = dict(hot_queries(db))[label]
+    statement = getattr(query, "statement", query)
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        details = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).fetchall()]
+    # "SCAN <table>" without an index is a full table scan; index scans and
+    # temp b-trees for ORDER BY are acceptable.
+    scans = [d for d in details if d.startswith("SCAN ") and "INDEX" not in d]
+    assert not scans, f"{label}: {'; '.join(details)}"
@@ -0,0 +1,47 @@
+"""``ensure_sqlite_schema`` numbers the approval chains of a database created before steps existed."""
+from app import database
+
+
+BASELINE_SCHEMA = """
+CREATE TABLE signers (id INTEGER PRIMARY KEY, name VARCHAR, email VARCHAR, region_id INTEGER, signing_order INTEGER);
+CREATE TABLE rental_requests (
+    id INTEGER PRIMARY KEY, user_id INTEGER, building_id INTEGER, selected_spaces TEXT,
+    total_price FLOAT, status VARCHAR, created_at DATETIME
+);
+CREATE TABLE request_approvals (
+    id INTEGER PRIMARY KEY, request_id INTEGER, signer_id INTEGER, status VARCHAR, action_at DATETIME, reason TEXT
+);
+INSERT INTO signers (id, name, email, signing_order) VALUES (1, 'A', 'a@test.local', 1), (2, 'B', 'b@test.local', 2),
+    (3, 'C', 'c@test.local', 3);
+INSERT INTO rental_requests (id, status) VALUES (1, 'rejected'), (2, 'in_progress');
+INSERT INTO request_approvals (id, request_id, signer_id, status) VALUES
+    (1, 1, 1, 'declined'), (2, 1, 2, 'pending'), (3, 1, 3, 'pending'),
+    (4, 2, 1, 'approved'), (5, 2, 2, 'pending'), (6, 2, 3, 'pending');
+"""
+
+
+def test_steps_backfill(tmp_path, monkeypatch):
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    raw = engine.raw_connection()
+    raw.executescript(BASELINE_SCHEMA)
+    raw.close()
+    monkeypatch.setattr(database, "engine", engine)
+
+    database.ensure_sqlite_schema()
+
+    with engine.connect() as conn:
+        approvals = conn.exec_driver_sql("SELECT id, step, status FROM request_approvals ORDER BY id").fetchall()
+        requests = conn.exec_driver_sql(
+            "SELECT id, current_step, total_steps FROM rental_requests ORDER BY id"
+        ).fetchall()
+    assert approvals == [
+        # Rejected: the signers after the decline are never asked
+        (1, 1, "declined"),
+        (2, 2, "waiting"),
+        (3, 3, "waiting"),
+        # Open: only the current step awaits a decision
+        (4, 1, "approved"),
+        (5, 2, "pending"),
+        (6, 3, "waiting"),
+    ]
+    assert requests == [(1, None, 3), (2, 2, 3)]
@@ -0,0 +1,38 @@
+"""A cached signer chain follows signer writes made by other processes."""
+from sqlalchemy import insert, update
+
+from app.database import SessionLocal, engine
+from app import main, models, workflow  # noqa: F401 (main creates the tables)
+
+
+def _write_signer_elsewhere(region_id: int) -> int:
+    """Add a signer the way another worker would: no Session listener in this process sees it."""
+    signers, versions = models.Signer.__table__, models.TableVersion.__table__
+    with engine.begin() as conn:
+        signer_id = conn.execute(
+            insert(signers).values(
+                name="Other worker", email="other-worker@test.local", region_id=region_id, signing_order=1
+            )
+        ).inserted_primary_key[0]
+        bumped = conn.execute(
+            update(versions).where(versions.c.table_name == "signers").values(version=versions.c.version + 1)
+        ).rowcount
+        if not bumped:
+            conn.execute(insert(versions).values(table_name="signers", version=1))
+    return signer_id
+
+
+def test_chain_is_reread_after_a_signer_write_in_another_process():
+    with SessionLocal() as db:
+        region = models.Region(name="Chain cache region")
+        db.add(region)
+        db.commit()
+        before = workflow.chains.get(db, region.id)
+        region_id = region.id
+
+    signer_id = _write_signer_elsewhere(region_id)
+
+    with SessionLocal() as db:
+        after = workflow.chains.get(db, region_id)
+    assert signer_id not in before
+    assert signer_id in after
@@ -0,0 +1,87 @@
+"""A rejected upload form must not leave blobs or temp files behind."""
+import glob
+import io
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.auth import create_access_token
+from app.database import SessionLocal
+from app.main import app
+from app import images, models, storage
+
+
+ADMIN_EMAIL = "uploads-admin@test.local"
+BUILDING = {
+    "name": "Tower",
+    "address": "Main 1",
+    "city": "Nukus",
+    "floors": "3",
+    "total_area": "100",
+    "price_per_m2": "10",
+}
+
+
+def image_bytes(color) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (40, 30), color).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def blob_files():
+    blobs = glob.glob(os.path.join(storage.BLOBS_DIR, "*", "*", "*"))
+    return sorted(blobs + glob.glob(os.path.join(storage.BLOBS_DIR, ".upload-*")))
+
+
+@pytest.fixture(autouse=True)
+def scratch_uploads(tmp_path, monkeypatch):
+    uploads = str(tmp_path / "uploads")
+    monkeypatch.setattr(storage, "UPLOADS_DIR", uploads)
+    monkeypatch.setattr(storage, "BLOBS_DIR", os.path.join(uploads, "blobs"))
+    monkeypatch.setattr(images, "UPLOADS_DIR", uploads)
+    monkeypatch.setattr(images, "VARIANTS_DIR", os.path.join(uploads, "variants"))
+
+
+@pytest.fixture(scope="module")
+def client():
+    with SessionLocal() as db:
+        if not db.query(models.User).filter_by(email=ADMIN_EMAIL).first():
+            db.add(models.User(name="Admin", email=ADMIN_EMAIL, password_hash="x", role="superadmin"))
+        region = models.Region(name="Uploads")
+        db.add(region)
+        db.commit()
+        BUILDING["region_id"] = str(region.id)
+    client = TestClient(app)
+    client.cookies.set("access_token", create_access_token(ADMIN_EMAIL))
+    return client
+
+
+def test_invalid_fields_discard_received_images(client):
+    before = blob_files()
+    data = {k: v for k, v in BUILDING.items() if k != "price_per_m2"}
+    files = [("images", ("a.jpg", image_bytes((1, 2, 3)), "image/jpeg"))]
+    response = client.post("/admin/buildings", data=data, files=files)
+    assert response.status_code == 422
+    assert blob_files() == before
+
+
+def test_rejected_later_file_discards_earlier_ones(client):
+    before = blob_files()
+    files = [
+        ("images", ("a.jpg", image_bytes((4, 5, 6)), "image/jpeg")),
+        ("images", ("b.txt", b"not an image at all", "text/plain")),
+    ]
+    response = client.post("/admin/buildings", data=BUILDING, files=files)
+    assert response.status_code == 415
+    assert blob_files() == before
+
+
+def test_valid_form_stores_its_images(client):
+    before = blob_files()
+    files = [("images", ("a.jpg", image_bytes((7, 8, 9)), "image/jpeg"))]
+    response = client.post("/admin/buildings", data=BUILDING, files=files, follow_redirects=False)
+    assert response.status_code == 302
+    added = sorted(set(blob_files()) - set(before))
+    assert len(added) == 1 and not os.path.basename(added[0]).startswith(".upload-")
@@ -0,0 +1,199 @@
+"""Approval chains: each request waits on one step at a time, in signing order."""
+import itertools
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.auth import create_access_token
+from app.database import SessionLocal
+from app import main, models, schemas, workflow  # noqa: F401 (main creates the tables)
+
+
+_ids = itertools.count(1)
+
+
+def make_chain(*signers: str):
+    """A fresh region whose chain is ``signers`` (signer user names, repeats allowed), plus a building in it.
+
+    Returns the building id and one signer user per distinct name.
+    """
+    n = next(_ids)
+    users = {}
+    with SessionLocal() as db:
+        region = models.Region(name=f"Workflow region {n}")
+        db.add(region)
+        db.flush()
+        for order, name in enumerate(signers, 1):
+            email = f"{name}-{n}@test.local"
+            if name not in users:
+                users[name] = models.User(name=name, email=email, password_hash="x", role="signer")
+                db.add(users[name])
+            db.add(models.Signer(name=name, email=email, region_id=region.id, signing_order=order))
+        building = models.Building(name=f"Workflow building {n}", city="Nukus", region_id=region.id)
+        db.add(building)
+        db.commit()
+        return building.id, {name: db.get(models.User, user.id) for name, user in users.items()}
+
+
+def submit(building_id: int) -> int:
+    with SessionLocal() as db:
+        email = f"resident-{next(_ids)}@test.local"
+        resident = models.User(name="Resident", email=email, password_hash="x", role="resident")
+        db.add(resident)
+        db.flush()
+        item = schemas.RentalRequestSubmit(building_id=building_id, selected_spaces="[]", total_price=100.0)
+        return workflow.submit_requests(db, resident, [item])[0].id
+
+
+def state(request_id: int):
+    """(request status, current step, approval statuses by step)."""
+    with SessionLocal() as db:
+        req = db.get(models.RentalRequest, request_id)
+        approvals = db.query(models.RequestApproval.status).filter_by(request_id=request_id)
+        return req.status, req.current_step, [s for (s,) in approvals.order_by(models.RequestApproval.step)]
+
+
+def approval_ids(request_id: int):
+    with SessionLocal() as db:
+        return [
+            approval_id
+            for (approval_id,) in db.query(models.RequestApproval.id)
+            .filter_by(request_id=request_id)
+            .order_by(models.RequestApproval.step)
+        ]
+
+
+def decide(action, user: models.User, approval_id: int, text: str = "no"):
+    with SessionLocal() as db:
+        try:
+            action(db, user, approval_id, text)
+        except HTTPException:
+            db.rollback()
+            raise
+        db.commit()
+
+
+def test_submission_waits_on_the_first_step():
+    building_id, _ = make_chain("a", "b", "c")
+    request_id = submit(building_id)
+    assert state(request_id) == ("pending", 1, ["pending", "waiting", "waiting"])
+
+
+def test_approvals_in_order_finish_the_request():
+    building_id, users = make_chain("a", "b")
+    request_id = submit(building_id)
+    first, second = approval_ids(request_id)
+
+    decide(workflow.approve, users["a"], first)
+    assert state(request_id) == ("in_progress", 2, ["approved", "pending"])
+
+    decide(workflow.approve, users["b"], second)
+    assert state(request_id) == ("approved", None, ["approved", "approved"])
+    with SessionLocal() as db:
+        assert db.query(models.Contract).filter_by(building_id=building_id, status="approved").count() == 1
+
+
+def test_out_of_turn_decision_is_refused():
+    building_id, users = make_chain("a", "b")
+    request_id = submit(building_id)
+    _, second = approval_ids(request_id)
+
+    with pytest.raises(HTTPException) as refused:
+        decide(workflow.approve, users["b"], second)
+    assert refused.value.status_code == 409
+    assert state(request_id) == ("pending", 1, ["pending", "waiting"])
+
+
+def test_another_signers_approval_is_refused():
+    building_id, users = make_chain("a", "b")
+    request_id = submit(building_id)
+    first, _ = approval_ids(request_id)
+
+    with pytest.raises(HTTPException) as refused:
+        decide(workflow.approve, users["b"], first)
+    assert refused.value.status_code == 403
+    assert state(request_id) == ("pending", 1, ["pending", "waiting"])
+
+
+def test_decline_rejects_the_whole_chain():
+    building_id, users = make_chain("a", "b", "c")
+    request_id = submit(building_id)
+    first, second, third = approval_ids(request_id)
+
+    decide(workflow.approve, users["a"], first)
+    decide(workflow.decline, users["b"], second, "Incomplete documents")
+    assert state(request_id) == ("rejected", None, ["approved", "declined", "waiting"])
+
+    with pytest.raises(HTTPException) as refused:
+        decide(workflow.approve, users["c"], third)
+    assert refused.value.status_code == 409
+
+
+def bulk(user: models.User, ids, action: str = "approve", reason=None):
+    client = TestClient(main.app)
+    client.cookies.set("access_token", create_access_token(user.email))
+    return client.post("/request-approvals/bulk", json={"action": action, "ids": ids, "reason": reason})
+
+
+def test_bulk_reports_refused_items_and_applies_the_rest():
+    building_id, users = make_chain("a", "b")
+    open_request, decided_request = submit(building_id), submit(building_id)
+    mine, theirs = approval_ids(open_request)
+    already_approved, _ = approval_ids(decided_request)
+    decide(workflow.approve, users["a"], already_approved)
+
+    response = bulk(users["a"], [mine, 10**9, theirs, already_approved, mine])
+
+    assert response.status_code == 200
+    assert [(item["id"], item["error"]) for item in response.json()] == [
+        (mine, None),
+        (10**9, "not_found"),
+        (theirs, "not_your_approval"),
+        (already_approved, "not_actionable"),
+    ]
+    assert response.json()[0]["status"] == "approved"
+    assert response.json()[0]["request_status"] == "in_progress"
+    assert state(open_request) == ("in_progress", 2, ["approved", "pending"])
+    assert state(decided_request) == ("in_progress", 2, ["approved", "pending"])
+
+
+def test_bulk_decides_consecutive_steps_of_one_signer():
+    building_id, users = make_chain("a", "a", "b")
+    request_id = submit(building_id)
+    first, second, third = approval_ids(request_id)
+
+    # Input order does not matter; steps are applied in order
+    response = bulk(users["a"], [second, first])
+
+    assert [item["error"] for item in response.json()] == [None, None]
+    assert state(request_id) == ("in_progress", 3, ["approved", "approved", "pending"])
+
+    response = bulk(users["b"], [third], action="decline", reason="Incomplete documents")
+    assert response.json()[0]["request_status"] == "rejected"
+    assert state(request_id) == ("rejected", None, ["approved", "approved", "declined"])
+
+
+def test_bulk_applies_nothing_when_a_request_moved_concurrently():
+    building_id, users = make_chain("a", "b")
+    untouched, moved = submit(building_id), submit(building_id)
+    (untouched_first, _), (moved_first, _) = approval_ids(untouched), approval_ids(moved)
+
+    with SessionLocal() as db:
+        # Read both requests (kept referenced, so the session keeps these copies),
+        # then let "another transaction" move one of them on
+        read = [db.get(models.RentalRequest, untouched), db.get(models.RentalRequest, moved)]
+        db.execute(
+            update(models.RentalRequest.__table__)
+            .where(models.RentalRequest.__table__.c.id == moved)
+            .values(current_step=2, status="in_progress")
+        )
+        assert read[1].current_step == 1
+        with pytest.raises(HTTPException) as refused:
+            workflow.decide_many(db, users["a"], [untouched_first, moved_first], "approve")
+        db.rollback()
+
+    assert refused.value.status_code == 409
+    assert state(untouched) == ("pending", 1, ["pending", "waiting"])
+    assert state(moved) == ("pending", 1, ["pending", "waiting"])